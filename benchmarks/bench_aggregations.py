@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+import aggregations
+from artist_store import ArtistStoreBuilder
+from reference import legacy_aggregates, random_artists
+
+# Compare l'ancien calcul de la popularité par pays et par genre (dictionnaires imbriqués,
+# un artiste et un genre à la fois) avec le group-by vectorisé de aggregations.py.
+# Utilisation : python benchmarks/bench_aggregations.py [nombre d'artistes]
+
+def vectorized(store):
+    return aggregations.country_popularity(store), aggregations.genre_popularity_by_country(store)
+
+def best_of(function, argument, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    artists = random_artists(count, max_fans=5_000_000)
+    builder = ArtistStoreBuilder()
+    for artist in artists:
+        builder.append(*artist)
+    store = builder.build()
+
+    legacy_time, legacy_result = best_of(legacy_aggregates, artists)
+    vectorized_time, vectorized_result = best_of(vectorized, store)
+    assert legacy_result == vectorized_result, "les agrégats vectorisés diffèrent de l'ancien calcul"
+
+    print(f"{count} artistes")
+    print(f"dictionnaires imbriqués : {legacy_time * 1000:8.1f} ms")
+    print(f"group-by vectorisé      : {vectorized_time * 1000:8.1f} ms  (x{legacy_time / vectorized_time:.1f})")
+
+    for name, query in (
+        ("top 10 par pays", lambda: aggregations.top_artists_by_country(store, 10)),
+        ("top 10 par genre", lambda: aggregations.top_artists_by_genre(store, 10)),
+        ("histogramme des fans", lambda: aggregations.fan_histogram(store)),
+        ("part des genres par pays", lambda: aggregations.genre_share_by_country(store)),
+    ):
+        elapsed, _ = best_of(lambda _: query(), None)
+        print(f"{name:<24}: {elapsed * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from api_client import APIClient
+from artist_store import ArtistStoreBuilder
+from data_loader import DataLoader
+from snapshot import Snapshot
+from wasabi_stub import WasabiStub, generate_pages
+
+# Compare le pic mémoire (tracemalloc) du chargement en flux de DataLoader.load_artists
+# avec l'ancien chargement qui gardait toutes les pages JSON en mémoire avant d'agréger.
+# Utilisation : python benchmarks/bench_memory.py [pages max]
+
+ARTISTS_PER_PAGE = 200
+ALBUMS_PER_ARTIST = 5
+SONGS_PER_ALBUM = 12
+
+def load_materialized(client, max_pages):
+    # Ancien algorithme : all_artists contient tous les artistes bruts avant le moindre calcul
+    all_artists = []
+    for _, artists in client.fetch_pages(range(1, max_pages + 1)):
+        all_artists.extend(artists)
+    loader = DataLoader(api_client=client)
+    builder = ArtistStoreBuilder()
+    for artist_details in all_artists:
+        DataLoader._store_artist(builder, DataLoader._project_artist(artist_details))
+    loader.snapshot = Snapshot.from_store(builder.build(), version=1)
+    return loader
+
+def load_streaming(client, max_pages):
+    loader = DataLoader(api_client=client)
+    loader.load_artists(max_pages=max_pages)
+    return loader
+
+def measure(load, client, max_pages):
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader = load(client, max_pages)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loader
+    return peak, retained
+
+def main():
+    max_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    stub = WasabiStub(generate_pages(max_pages, ARTISTS_PER_PAGE, ALBUMS_PER_ARTIST, SONGS_PER_ALBUM)).start()
+    for page in stub.pages:
+        stub.body(page)  # Sérialise les pages avant la mesure
+    client = APIClient(base_url=stub.base_url)
+
+    print(f"{'pages':>6} {'méthode':>12} {'pic (Mo)':>10} {'conservé (Mo)':>14} {'surcoût (Mo)':>13}")
+    page_counts = sorted({max(1, max_pages // 4), max(1, max_pages // 2), max_pages})
+    for page_count in page_counts:
+        for name, load in (("matérialisé", load_materialized), ("flux", load_streaming)):
+            peak, retained = measure(load, client, page_count)
+            print(f"{page_count:>6} {name:>12} {peak / 1e6:>10.1f} {retained / 1e6:>14.1f} {(peak - retained) / 1e6:>13.1f}")
+
+    client.close()
+    stub.stop()
+
+if __name__ == "__main__":
+    main()
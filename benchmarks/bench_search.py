@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from artist_index import ArtistIndex
+from artist_store import ArtistRecords, ArtistStoreBuilder
+from reference import random_artists
+
+# Compare les recherches par index (artist_index.py) avec un parcours linéaire de
+# get_artist_data(), la seule possibilité avant les index (analyse du champ "location").
+# Utilisation : python benchmarks/bench_search.py [nombre d'artistes]
+
+def synthetic_store(count):
+    builder = ArtistStoreBuilder()
+    for artist in random_artists(count, max_fans=5_000_000):
+        builder.append(*artist)
+    return builder.build()
+
+def linear_scan(artist_data, prefix=None, country=None, genre=None, min_fans=None, max_fans=None, limit=20):
+    matches = []
+    for artist in artist_data:
+        artist_country = artist["location"].rsplit(", ", 1)[-1]
+        if prefix is not None and not artist["name"].casefold().startswith(prefix.casefold()):
+            continue
+        if country is not None and artist_country != country:
+            continue
+        if genre is not None and genre not in artist["genres"]:
+            continue
+        if min_fans is not None and artist["deezer_fans"] < min_fans:
+            continue
+        if max_fans is not None and artist["deezer_fans"] > max_fans:
+            continue
+        matches.append(artist)
+    matches.sort(key=lambda artist: -artist["deezer_fans"])
+    return matches[:limit]
+
+def best_of(function, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    store = synthetic_store(count)
+    start = time.perf_counter()
+    index = ArtistIndex.build(store)
+    print(f"{count} artistes, construction des index : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Le parcours linéaire se fait sur les dictionnaires déjà construits (meilleur cas pour lui)
+    artist_data = list(ArtistRecords(store))
+    queries = (
+        ("pays + genre, triés par fans", {"country": "France", "genre": "Rock"}),
+        ("préfixe de nom", {"prefix": "eden"}),
+        ("intervalle de fans", {"min_fans": 1_000_000, "max_fans": 1_001_000}),
+        ("pays + genre + fans", {"country": "Japan", "genre": "Jazz", "min_fans": 4_000_000}),
+        ("tous, page 50", {"offset": 1000}),
+    )
+    print(f"{'requête':>30} {'parcours (ms)':>14} {'index (ms)':>11} {'gain':>7}")
+    for name, criteria in queries:
+        scan_criteria = {key: value for key, value in criteria.items() if key != "offset"}
+        scan = best_of(lambda: linear_scan(artist_data, limit=criteria.get("offset", 0) + 20, **scan_criteria))
+        indexed = best_of(lambda: index.search(limit=20, **criteria))
+        print(f"{name:>30} {scan * 1000:>14.1f} {indexed * 1000:>11.2f} {scan / indexed:>6.0f}x")
+
+if __name__ == "__main__":
+    main()
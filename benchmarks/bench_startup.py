@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from api_client import APIClient
+from data_loader import DataLoader
+from wasabi_stub import WasabiStub, generate_pages
+
+# Compare le temps de démarrage (données prêtes + première requête par pays et par genre) :
+# chargement depuis l'API (serveur WASABI local, décodage JSON) ou relecture d'un instantané binaire.
+# Utilisation : python benchmarks/bench_startup.py [pages]
+
+def first_queries(loader):
+    loader.get_country_popularity()
+    loader.get_genre_popularity_by_country()
+    loader.get_top_artists(10, country="France", genre="Rock")
+
+def timed(start_up):
+    start = time.perf_counter()
+    loader = start_up()
+    ready = time.perf_counter() - start
+    first_queries(loader)
+    return ready, time.perf_counter() - start
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    stub = WasabiStub(generate_pages(page_count, artists_per_page=200, albums_per_artist=3, songs_per_album=10)).start()
+    for page in stub.pages:
+        stub.body(page)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "snapshot")
+
+        def from_api():
+            client = APIClient(base_url=stub.base_url)
+            loader = DataLoader(api_client=client)
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader.load_artists()
+            client.close()
+            return loader
+
+        def from_snapshot(verify):
+            loader = DataLoader()
+            loader.load_snapshot(directory, verify=verify)
+            return loader
+
+        from_api().save_snapshot(directory)
+        print(f"{page_count * 200} artistes ({page_count} pages)")
+        print(f"{'démarrage':>36} {'données prêtes (ms)':>20} {'+ premières requêtes (ms)':>26}")
+        for name, start_up in (
+            ("API (JSON)", from_api),
+            ("instantané mmap, SHA-256 vérifiés", lambda: from_snapshot(True)),
+            ("instantané mmap, tailles vérifiées", lambda: from_snapshot(False)),
+        ):
+            ready, total = min(timed(start_up) for _ in range(3))
+            print(f"{name:>36} {ready * 1000:>20.1f} {total * 1000:>26.1f}")
+
+    stub.stop()
+
+if __name__ == "__main__":
+    main()
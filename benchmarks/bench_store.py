@@ -0,0 +1,69 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from artist_store import ArtistStoreBuilder
+from data_loader import DataLoader
+from wasabi_stub import generate_artist
+
+# Compare la mémoire par artiste et le temps de construction de l'ancienne liste de
+# dictionnaires (DataLoader.artist_data) et du stockage en colonnes (ArtistStore).
+# Utilisation : python benchmarks/bench_store.py [nombre d'artistes]
+
+def build_dicts(artists):
+    artist_data = []
+    for artist in artists:
+        artist_data.append({
+            "name": artist["name"],
+            "location": f"{artist['city']}, {artist['country']}",
+            "deezer_fans": artist["deezer_fans"],
+            "genres": artist["genres"],
+            "albums": artist["albums"],
+        })
+    return artist_data
+
+def build_store(artists):
+    builder = ArtistStoreBuilder()
+    for artist in artists:
+        DataLoader._store_artist(builder, artist)
+    return builder.build()
+
+def measure_memory(build, make_artists):
+    # Les artistes projetés sont créés pendant la mesure, comme pendant un vrai chargement :
+    # seul ce que la structure finale conserve reste compté
+    tracemalloc.start()
+    result = build(make_artists())
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+def measure_time(build, artists):
+    # Pour la liste de dictionnaires, la construction réutilise les objets déjà projetés :
+    # son coût réel est payé pendant la projection
+    start = time.perf_counter()
+    build(artists)
+    return time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    def make_artists():
+        # Les artistes bruts sont générés au fil de l'eau, comme s'ils venaient de l'API
+        rng = random.Random(0)
+        return (DataLoader._project_artist(generate_artist(rng, i, albums_per_artist=4, songs_per_album=10)) for i in range(count))
+
+    projected = list(make_artists())
+    print(f"{count} artistes (4 albums de 10 chansons chacun)")
+    print(f"{'structure':>22} {'construction (s)':>17} {'octets/artiste':>15}")
+    for name, build in (("liste de dictionnaires", build_dicts), ("colonnes", build_store)):
+        elapsed = measure_time(build, projected)
+        retained = measure_memory(build, make_artists)
+        print(f"{name:>22} {elapsed:>17.3f} {retained / count:>15.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+from api_client import APIClient
+from data_loader import DataLoader
+from http_cache import ResponseCache
+from wasabi_stub import WasabiStub, generate_pages
+
+# Jeu de données synthétique servi par un serveur WASABI local (aucun accès à Internet).
+# Taille réglable par variables d'environnement, par exemple :
+#   WASABI_BENCH_PAGES=50 WASABI_BENCH_ARTISTS_PER_PAGE=200 python -m pytest benchmarks
+
+PAGES = int(os.environ.get("WASABI_BENCH_PAGES", 10))
+ARTISTS_PER_PAGE = int(os.environ.get("WASABI_BENCH_ARTISTS_PER_PAGE", 100))
+ALBUMS_PER_ARTIST = int(os.environ.get("WASABI_BENCH_ALBUMS", 3))
+SONGS_PER_ALBUM = int(os.environ.get("WASABI_BENCH_SONGS", 10))
+
+@pytest.fixture(scope="session")
+def wasabi_stub():
+    stub = WasabiStub(generate_pages(PAGES, ARTISTS_PER_PAGE, ALBUMS_PER_ARTIST, SONGS_PER_ALBUM)).start()
+    for page in stub.pages:
+        stub.body(page)  # Sérialise les pages avant toute mesure
+    yield stub
+    stub.stop()
+
+@pytest.fixture(scope="session")
+def dataset_size(wasabi_stub):
+    return {
+        "pages": PAGES,
+        "artists": PAGES * ARTISTS_PER_PAGE,
+        "bytes": sum(len(wasabi_stub.body(page)) for page in wasabi_stub.pages),
+    }
+
+@pytest.fixture(scope="session")
+def loaded_loader(wasabi_stub):
+    client = APIClient(base_url=wasabi_stub.base_url, backoff_factor=0)
+    loader = DataLoader(api_client=client)
+    loader.load_artists(max_pages=PAGES)
+    client.close()
+    return loader
+
+@pytest.fixture(scope="session")
+def warm_cache_dir(wasabi_stub):
+    # Cache disque déjà rempli avec toutes les pages (voir http_cache.py)
+    directory = tempfile.mkdtemp(prefix="wasabi-bench-cache-")
+    client = APIClient(base_url=wasabi_stub.base_url, backoff_factor=0, cache=ResponseCache(directory))
+    DataLoader(api_client=client).load_artists(max_pages=PAGES)
+    client.close()
+    yield directory
+    shutil.rmtree(directory, ignore_errors=True)
+
+@pytest.fixture(scope="session")
+def snapshot_dir(loaded_loader):
+    directory = tempfile.mkdtemp(prefix="wasabi-bench-snapshot-")
+    path = os.path.join(directory, "snapshot")
+    loaded_loader.save_snapshot(path)
+    yield path
+    shutil.rmtree(directory, ignore_errors=True)
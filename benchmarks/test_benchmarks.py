@@ -0,0 +1,111 @@
+import contextlib
+import io
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")  # pip install pytest-benchmark
+
+import server
+from api_client import APIClient
+from data_loader import DataLoader
+from http_cache import ResponseCache
+from metrics import Metrics
+from snapshot import Snapshot
+
+# Suite pytest-benchmark : débit et mémoire du chargement, des agrégats, de la recherche et du serveur,
+# mesurés hors ligne contre le serveur WASABI local (voir conftest.py).
+# Utilisation : python -m pytest benchmarks --benchmark-autosave
+# puis, pour détecter une régression : python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:20%
+
+ROUNDS = 3
+
+# Mémoire de travail maximale du chargement, au-delà des données conservées (stockage, index, agrégats) :
+# - le chargement en flux : quelques pages en cours de téléchargement ou de décodage, quel que soit leur nombre ;
+# - la construction des index (tris des noms et des fans) : proportionnelle au stockage (environ 0,3 fois sa taille).
+TRANSIENT_PAGES = 8
+TRANSIENT_OVERHEAD = 4 * 1024 * 1024
+TRANSIENT_STORE_RATIO = 0.5
+
+def load(client, metrics, max_pages):
+    loader = DataLoader(api_client=client, metrics=metrics)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_artists(max_pages=max_pages)
+    client.close()
+    return loader
+
+def record(benchmark, dataset_size, metrics=None):
+    # Débit (sur le meilleur passage) et détail des mesures du dernier passage dans le rapport JSON
+    if benchmark.stats is None:
+        return  # --benchmark-disable : chaque test n'est exécuté qu'une fois, sans mesure
+    seconds = benchmark.stats.stats.min
+    benchmark.extra_info["artists_per_second"] = dataset_size["artists"] / seconds
+    benchmark.extra_info["megabytes_per_second"] = dataset_size["bytes"] / seconds / 1e6
+    if metrics is not None:
+        benchmark.extra_info["metrics"] = metrics.as_dict()
+
+def test_load_from_network(benchmark, wasabi_stub, dataset_size):
+    metrics = Metrics()
+
+    def setup():
+        return (APIClient(base_url=wasabi_stub.base_url, backoff_factor=0, metrics=metrics), metrics, dataset_size["pages"]), {}
+
+    loader = benchmark.pedantic(load, setup=setup, rounds=ROUNDS)
+    assert loader.total_artists == dataset_size["artists"]
+    record(benchmark, dataset_size, metrics)
+
+def test_load_from_warm_cache(benchmark, wasabi_stub, warm_cache_dir, dataset_size):
+    metrics = Metrics()
+
+    def setup():
+        cache = ResponseCache(warm_cache_dir)
+        return (APIClient(base_url=wasabi_stub.base_url, backoff_factor=0, cache=cache, metrics=metrics), metrics, dataset_size["pages"]), {}
+
+    loader = benchmark.pedantic(load, setup=setup, rounds=ROUNDS)
+    assert loader.total_artists == dataset_size["artists"]
+    assert metrics.get("wasabi_pages_total", source="network") is None
+    record(benchmark, dataset_size, metrics)
+
+@pytest.mark.parametrize("verify", [True, False], ids=["sha256", "sizes"])
+def test_load_from_snapshot(benchmark, snapshot_dir, dataset_size, verify):
+    def load_snapshot():
+        loader = DataLoader()
+        loader.load_snapshot(snapshot_dir, verify=verify)
+        return loader
+
+    loader = benchmark.pedantic(load_snapshot, rounds=ROUNDS * 2)
+    assert loader.total_artists == dataset_size["artists"]
+
+def test_aggregations(benchmark, loaded_loader, dataset_size):
+    store = loaded_loader.artist_store
+    snapshot = benchmark.pedantic(Snapshot.from_store, args=(store, 1), rounds=ROUNDS * 2)
+    assert snapshot.country_popularity == loaded_loader.country_popularity
+    record(benchmark, dataset_size)
+
+def test_search(benchmark, loaded_loader):
+    result = benchmark(loaded_loader.search_artists, prefix="artist 1", country="France", min_fans=1000)
+    assert all(artist["country"] == "France" for artist in result["results"])
+
+def test_server_not_modified(benchmark, loaded_loader):
+    client = server.create_app(loaded_loader).test_client()
+    etag = client.get("/api/artists").headers["ETag"]
+    response = benchmark(client.get, "/api/artists", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_load_memory_is_bounded(wasabi_stub, dataset_size):
+    # Régression mémoire : la mémoire de travail ne doit pas grandir avec le nombre de pages
+    # plus vite que les données elles-mêmes
+    client = APIClient(base_url=wasabi_stub.base_url, backoff_factor=0, max_workers=4)
+    tracemalloc.start()
+    try:
+        loader = load(client, Metrics(), dataset_size["pages"])
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    largest_page = max(len(wasabi_stub.body(page)) for page in wasabi_stub.pages)
+    store_bytes = loader.artist_store.nbytes
+    transient = peak - retained
+    assert loader.total_artists == dataset_size["artists"]
+    assert transient < TRANSIENT_PAGES * largest_page + TRANSIENT_OVERHEAD + TRANSIENT_STORE_RATIO * store_bytes, \
+        f"{transient / 1e6:.1f} Mo de mémoire de travail pour des pages de {largest_page / 1e6:.1f} Mo " \
+        f"et un stockage de {store_bytes / 1e6:.1f} Mo"
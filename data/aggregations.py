@@ -0,0 +1,143 @@
+import numpy as np
+
+# Agrégations vectorisées sur un ArtistStore (voir artist_store.py).
+# Chaque agrégat est un seul « group-by » NumPy sur les colonnes de codes, au lieu
+# d'une boucle Python artiste par artiste et genre par genre.
+
+# Seuils de la carte (src/visualizations/world_map.js), utilisés par défaut pour l'histogramme des fans
+FAN_BINS = [0, 100_000, 1_000_000, 10_000_000, 30_000_000, 100_000_000, 500_000_000]
+
+def _group_sum(keys, values, size):
+    # Somme exacte en int64 (np.bincount passerait par des float64)
+    sums = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, keys, values)
+    return sums
+
+def explode_genres(store):
+    # Une ligne par couple (artiste, genre) : renvoie l'indice de l'artiste de chaque ligne.
+    # Les genres répétés pour un même artiste sont conservés, comme dans l'ancien calcul.
+    return np.repeat(np.arange(len(store)), np.diff(store.genre_offsets))
+
+def country_popularity(store):
+    counts = np.bincount(store.country_codes, minlength=len(store.countries))
+    totals = _group_sum(store.country_codes, store.fans, len(store.countries))
+    # Les codes suivent l'ordre de première apparition des pays, comme les clés de l'ancien dictionnaire
+    return {
+        country: {"artist_count": count, "total_popularity": total}
+        for country, count, total in zip(store.countries, counts.tolist(), totals.tolist())
+        if count
+    }
+
+def _group_first(keys, size):
+    # Première ligne où apparaît chaque clé (len(keys) pour les clés absentes)
+    first = np.full(size, len(keys), dtype=np.int64)
+    np.minimum.at(first, keys, np.arange(len(keys)))
+    return first
+
+def genre_popularity_by_country(store):
+    result = {country: {} for country in country_popularity(store)}
+    artists = explode_genres(store)
+    if not len(artists):
+        return result
+
+    # Une clé dense par couple (pays, genre), puis une somme des fans par clé
+    size = len(store.countries) * len(store.genres)
+    pairs = store.country_codes[artists].astype(np.int64) * len(store.genres) + store.genre_codes
+    sums = _group_sum(pairs, store.fans[artists], size)
+    first = _group_first(pairs, size)
+
+    # Les genres sont insérés dans l'ordre de leur première apparition pour le pays
+    keys = np.flatnonzero(first < len(pairs))
+    keys = keys[np.argsort(first[keys], kind="stable")]
+    for key, total in zip(keys.tolist(), sums[keys].tolist()):
+        country, genre = divmod(key, len(store.genres))
+        result[store.countries[country]][store.genres[genre]] = total
+    return result
+
+def genre_occurrences_by_country(store):
+    # {(pays, genre): nombre de couples (artiste, genre)}, utilisé pour les mises à jour incrémentales
+    artists = explode_genres(store)
+    pairs = store.country_codes[artists].astype(np.int64) * len(store.genres) + store.genre_codes
+    counts = np.bincount(pairs, minlength=len(store.countries) * len(store.genres))
+    return {
+        (store.countries[key // len(store.genres)], store.genres[key % len(store.genres)]): int(counts[key])
+        for key in np.flatnonzero(counts).tolist()
+    }
+
+def genre_share_by_country(store):
+    # Part de chaque genre dans le total des fans (par genre) du pays
+    share = {}
+    for country, genres in genre_popularity_by_country(store).items():
+        total = sum(genres.values())
+        share[country] = {genre: (fans / total if total else 0.0) for genre, fans in genres.items()}
+    return share
+
+def _top_per_group(groups, artists, fans, n):
+    # Trie les lignes par groupe puis par fans décroissants (ordre de chargement en cas d'égalité),
+    # supprime les doublons (un genre répété pour un artiste, voir artist_index._grouped)
+    # et garde les n premières de chaque groupe
+    if not len(groups):
+        return groups, artists
+    order = np.lexsort((artists, -fans, groups))
+    groups, artists = groups[order], artists[order]
+    keep = np.r_[True, (groups[1:] != groups[:-1]) | (artists[1:] != artists[:-1])]
+    groups, artists = groups[keep], artists[keep]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    ranks = np.arange(len(groups)) - np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+    if n is None:
+        return groups, artists
+    keep = ranks < n
+    return groups[keep], artists[keep]
+
+def _grouped_summaries(store, table, groups, artists):
+    result = {}
+    for group, artist in zip(groups.tolist(), artists.tolist()):
+        result.setdefault(table[group], []).append(store.summary(artist))
+    return result
+
+def top_artists_by_country(store, n=10):
+    artists = np.arange(len(store))
+    groups, artists = _top_per_group(store.country_codes, artists, store.fans, n)
+    return _grouped_summaries(store, store.countries, groups, artists)
+
+def top_artists_by_genre(store, n=10):
+    artists = explode_genres(store)
+    groups, artists = _top_per_group(store.genre_codes, artists, store.fans[artists], n)
+    return _grouped_summaries(store, store.genres, groups, artists)
+
+def _code(table, value):
+    try:
+        return table.index(value)
+    except ValueError:
+        return None
+
+def artist_mask(store, country=None, genre=None):
+    # Masque booléen des artistes du pays et/ou du genre demandés
+    mask = np.ones(len(store), dtype=bool)
+    if country is not None:
+        code = _code(store.countries, country)
+        if code is None:
+            return np.zeros(len(store), dtype=bool)
+        mask &= store.country_codes == code
+    if genre is not None:
+        code = _code(store.genres, genre)
+        if code is None:
+            return np.zeros(len(store), dtype=bool)
+        artists = explode_genres(store)
+        has_genre = np.zeros(len(store), dtype=bool)
+        has_genre[artists[store.genre_codes == code]] = True
+        mask &= has_genre
+    return mask
+
+def top_artists(store, n=10, country=None, genre=None):
+    artists = np.flatnonzero(artist_mask(store, country, genre))
+    order = np.lexsort((artists, -store.fans[artists]))[:n]
+    return [store.summary(artist) for artist in artists[order].tolist()]
+
+def fan_histogram(store, bins=None, country=None, genre=None):
+    # counts[i] : nombre d'artistes avec bins[i] <= fans < bins[i + 1] ; la dernière classe est ouverte
+    edges = list(bins if bins is not None else FAN_BINS)
+    fans = store.fans[artist_mask(store, country, genre)]
+    classes = np.searchsorted(edges, fans, side="right") - 1
+    counts = np.bincount(classes[classes >= 0], minlength=len(edges))
+    return {"edges": edges, "counts": counts.tolist()}
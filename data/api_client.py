@@ -1,32 +1,152 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import json
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import REGISTRY
 
 class APIClient:
     BASE_URL = "https://wasabi.i3s.unice.fr/api/v1/artist_all/"
 
-    @staticmethod
-    def fetch_artists(page):
+    # Codes HTTP pour lesquels on réessaie la requête (limitation de débit et erreurs serveur)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url=None, timeout=10, max_retries=3, backoff_factor=0.5, max_workers=4, cache=None, metrics=None):
+        self.base_url = base_url or APIClient.BASE_URL
+        self.cache = cache  # ResponseCache optionnel (voir http_cache.py)
+        self.metrics = metrics or REGISTRY  # Mesures des appels (voir metrics.py)
+        self.timeout = timeout  # Délai maximal (en secondes) pour chaque requête
+        self.max_workers = max_workers  # Nombre maximal de pages récupérées en parallèle
+
+        # Une seule session partagée : les connexions TCP/TLS sont réutilisées (keep-alive)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,  # Attente exponentielle entre deux tentatives
+            status_forcelist=APIClient.RETRY_STATUSES,
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def page_url(self, page):
+        return f"{self.base_url}{page}"
+
+    def fetch_page_content(self, page):
+        # Renvoie le corps JSON brut (bytes) de la page, depuis le cache si possible
+        url = self.page_url(page)
+        entry = self.cache.get(url) if self.cache else None
+        headers = {}
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                content = self.cache.read(entry)
+                if content is not None:
+                    self.metrics.inc("wasabi_pages_total", source="cache")
+                    return content
+                entry = None  # Corps illisible, déjà compté comme absent : requête complète
+            else:
+                headers = self.cache.conditional_headers(entry)
+
+        response = self._get(url, headers)
+        if response.status_code == 304 and entry is not None:
+            content = self.cache.revalidate(entry)
+            if content is not None:
+                self.metrics.inc("wasabi_pages_total", source="revalidated")
+                return content
+            response = self._get(url, {})  # Entrée perdue : on refait un appel complet
+        elif entry is not None and response.ok:
+            self.cache.record_miss()  # Entrée expirée et page modifiée depuis sa mise en cache
+        response.raise_for_status()  # Vérifie que la requête a réussi
+
+        self.metrics.inc("wasabi_pages_total", source="network")
+        self.metrics.inc("wasabi_bytes_downloaded_total", len(response.content))
+        if self.cache:
+            self.cache.put(url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.content
+
+    def _get(self, url, headers):
+        # Latence d'un appel HTTP, tentatives comprises (le corps est lu entièrement par requests)
+        with self.metrics.timer("wasabi_page_fetch_seconds"):
+            return self.session.get(url, timeout=self.timeout, headers=headers)
+
+    def fetch_artists(self, page):
         # Effectue l'appel API pour récupérer les artistes à partir de la page spécifiée
-        response = requests.get(f"{APIClient.BASE_URL}{page}")
-        
         try:
-            response.raise_for_status()  # Vérifie que la requête a réussi
-            artists = response.json()
+            artists = json.loads(self.fetch_page_content(page))
 
             # Affichage pour voir combien d'artistes ont été retournés
-            print(f"Appel à {APIClient.BASE_URL}{page} => Nombre d'artistes récupérés: {len(artists)}")
+            print(f"Appel à {self.page_url(page)} => Nombre d'artistes récupérés: {len(artists)}")
 
             return artists
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if isinstance(e, ValueError):
+                self.discard_page(page)
+            self.metrics.inc("wasabi_pages_total", source="error")
             print(f"Erreur lors de la récupération des artistes de la page {page}: {e}")
             return []
 
-    @staticmethod
-    def fetch_all_artists(page):
+    def discard_page(self, page):
+        # Les corps sont mis en cache avant d'être décodés : l'appelant qui n'arrive pas à décoder
+        # une page la retire du cache, pour qu'elle soit retéléchargée au prochain appel
+        if self.cache:
+            self.cache.discard(self.page_url(page))
+
+    def fetch_all_artists(self, page):
         # Cette méthode est désormais sans paramètre max_pages
         all_artists = []
-        artists = APIClient.fetch_artists(page)  # Récupère les artistes pour la page donnée
+        artists = self.fetch_artists(page)  # Récupère les artistes pour la page donnée
 
         if artists:
             all_artists.extend(artists)  # Ajouter les artistes récupérés à la liste finale
 
         return all_artists
+
+    def fetch_raw_page(self, page):
+        # Comme fetch_page_content, mais renvoie None en cas d'erreur au lieu de lever une exception
+        try:
+            return self.fetch_page_content(page)
+        except requests.exceptions.RequestException as e:
+            self.metrics.inc("wasabi_pages_total", source="error")
+            print(f"Erreur lors de la récupération des artistes de la page {page}: {e}")
+            return None
+
+    def fetch_pages(self, pages):
+        # Récupère plusieurs pages en parallèle et les renvoie dans l'ordre des pages,
+        # pour que les agrégats calculés ensuite restent déterministes.
+        return self._fetch_in_order(self.fetch_artists, pages)
+
+    def fetch_page_contents(self, pages):
+        # Même chose que fetch_pages, mais renvoie le corps JSON brut de chaque page
+        # (None en cas d'erreur), pour que l'appelant puisse le décoder au fil de l'eau.
+        return self._fetch_in_order(self.fetch_raw_page, pages)
+
+    def _fetch_in_order(self, fetch, pages):
+        # Au plus max_workers pages sont en cours de téléchargement (ou en attente
+        # d'être consommées) à un instant donné : pages peut donc être infini.
+        pages = iter(pages)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending = deque(
+                (page, executor.submit(fetch, page))
+                for page in itertools.islice(pages, self.max_workers)
+            )
+            while pending:
+                page, future = pending.popleft()
+                result = future.result()
+                for next_page in itertools.islice(pages, 1):
+                    pending.append((next_page, executor.submit(fetch, next_page)))
+                yield page, result
+        finally:
+            # Si l'appelant s'arrête avant la fin, les pages pas encore commencées sont annulées
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        if self.cache:
+            self.cache.flush()
+        self.session.close()
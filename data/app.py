@@ -1,11 +1,21 @@
+import os
+
+from api_client import APIClient
 from data_loader import DataLoader
+from http_cache import ResponseCache
+
+# Répertoire du cache disque des pages WASABI (à la racine du projet)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "wasabi")
 
 def main():
-    # Initialiser le DataLoader
-    data_loader = DataLoader()
+    # Initialiser le DataLoader (les pages déjà téléchargées sont relues depuis le cache disque)
+    api_client = APIClient(cache=ResponseCache(CACHE_DIR))
+    data_loader = DataLoader(api_client=api_client)
     
-    # Charger les artistes (récupère les artistes des pages 1 à 15)
+    # Charger les artistes (parcourt tout le catalogue, page par page)
     data_loader.load_artists()
+    api_client.close()
+    print(f"Cache : {api_client.cache.stats()}")
     
     # Récupérer les données des artistes
     artist_data = data_loader.get_artist_data()
@@ -0,0 +1,148 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from artist_store import StringColumnBuilder
+from aggregations import _code, explode_genres
+
+# Index secondaires sur un ArtistStore, construits une fois au chargement :
+# - (pays, genre), pays seul et genre seul -> identifiants d'artistes déjà triés par fans décroissants ;
+# - noms en minuscules triés, pour la recherche par préfixe (dichotomie) ;
+# - artistes triés par fans décroissants, pour les requêtes par intervalle de fans.
+# Tous les index sont des tableaux NumPy (et une StringColumn), sauvegardables dans un instantané.
+
+INDEX_ARRAYS = ("pair_keys", "pair_offsets", "pair_artists", "country_offsets", "country_artists",
+                "genre_offsets", "genre_artists", "fan_order", "name_order")
+
+def _normalize(name):
+    return name.casefold()
+
+def _grouped(groups, artists, fans, group_count):
+    # Trie les lignes par groupe puis par fans décroissants (identifiant croissant en cas d'égalité),
+    # supprime les doublons (un genre répété pour un artiste) et renvoie (offsets, artistes)
+    order = np.lexsort((artists, -fans, groups))
+    groups, artists = groups[order], artists[order]
+    if len(groups):
+        keep = np.r_[True, (groups[1:] != groups[:-1]) | (artists[1:] != artists[:-1])]
+        groups, artists = groups[keep], artists[keep]
+    offsets = np.zeros(group_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(groups, minlength=group_count), out=offsets[1:])
+    return offsets, artists.astype(np.int64)
+
+class ArtistIndex:
+    def __init__(self, store, sorted_names, **arrays):
+        self.store = store
+        self.sorted_names = sorted_names  # StringColumn des noms normalisés, dans l'ordre de name_order
+        for name in INDEX_ARRAYS:
+            setattr(self, name, arrays[name])
+        # Rang de chaque artiste dans les deux ordres de tri (pour retrier un sous-ensemble)
+        self.fan_rank = np.empty(len(store), dtype=np.int64)
+        self.fan_rank[self.fan_order] = np.arange(len(store))
+        self.name_rank = np.empty(len(store), dtype=np.int64)
+        self.name_rank[self.name_order] = np.arange(len(store))
+        self._negated_fans = -store.fans[self.fan_order]  # Croissant : utilisable par np.searchsorted
+
+    @staticmethod
+    def build(store):
+        artists = np.arange(len(store), dtype=np.int64)
+        exploded = explode_genres(store)
+        genre_count = len(store.genres)
+
+        # (pays, genre) : clés denses, puis seules les clés présentes sont gardées
+        pairs = store.country_codes[exploded].astype(np.int64) * genre_count + store.genre_codes
+        pair_offsets, pair_artists = _grouped(pairs, exploded, store.fans[exploded], len(store.countries) * genre_count)
+        sizes = np.diff(pair_offsets)
+        pair_keys = np.flatnonzero(sizes)
+        pair_offsets = np.r_[0, np.cumsum(sizes[pair_keys])].astype(np.int64)
+
+        country_offsets, country_artists = _grouped(store.country_codes, artists, store.fans, len(store.countries))
+        genre_offsets, genre_artists = _grouped(store.genre_codes, exploded, store.fans[exploded], genre_count)
+
+        fan_order = np.lexsort((artists, -store.fans)).astype(np.int64)
+
+        names = [_normalize(store.names[i]) for i in range(len(store))]
+        name_order = np.array(sorted(range(len(store)), key=names.__getitem__), dtype=np.int64)
+        sorted_names = StringColumnBuilder()
+        sorted_names.extend(names[i] for i in name_order.tolist())
+
+        return ArtistIndex(
+            store, sorted_names.build(),
+            pair_keys=pair_keys, pair_offsets=pair_offsets, pair_artists=pair_artists,
+            country_offsets=country_offsets, country_artists=country_artists,
+            genre_offsets=genre_offsets, genre_artists=genre_artists,
+            fan_order=fan_order, name_order=name_order,
+        )
+
+    def by_country_genre(self, country=None, genre=None):
+        # Artistes du pays et/ou du genre (tous les artistes si aucun des deux), triés par fans décroissants
+        if country is None and genre is None:
+            return self.fan_order
+        country_code = _code(self.store.countries, country) if country is not None else None
+        genre_code = _code(self.store.genres, genre) if genre is not None else None
+        if (country is not None and country_code is None) or (genre is not None and genre_code is None):
+            return np.array([], dtype=np.int64)
+        if country is not None and genre is not None:
+            key = country_code * len(self.store.genres) + genre_code
+            position = np.searchsorted(self.pair_keys, key)
+            if position == len(self.pair_keys) or self.pair_keys[position] != key:
+                return np.array([], dtype=np.int64)
+            return self.pair_artists[self.pair_offsets[position]:self.pair_offsets[position + 1]]
+        if country is not None:
+            return self.country_artists[self.country_offsets[country_code]:self.country_offsets[country_code + 1]]
+        return self.genre_artists[self.genre_offsets[genre_code]:self.genre_offsets[genre_code + 1]]
+
+    def by_name_prefix(self, prefix):
+        # Artistes dont le nom commence par prefix (sans tenir compte de la casse), triés par nom
+        # bisect n'a besoin que de __getitem__ et __len__ : la StringColumn est décodée à la demande
+        prefix = _normalize(prefix)
+        start = bisect_left(self.sorted_names, prefix)
+        stop = bisect_left(self.sorted_names, prefix + "\U0010ffff", lo=start)
+        return self.name_order[start:stop]
+
+    def by_fans(self, min_fans=None, max_fans=None):
+        # Artistes avec min_fans <= fans <= max_fans, triés par fans décroissants
+        negated = self._negated_fans
+        start = np.searchsorted(negated, -max_fans, side="left") if max_fans is not None else 0
+        stop = np.searchsorted(negated, -min_fans, side="right") if min_fans is not None else len(negated)
+        return self.fan_order[start:stop]
+
+    def search(self, prefix=None, country=None, genre=None, min_fans=None, max_fans=None, order="fans", offset=0, limit=20):
+        # Combine les index : on part du plus petit ensemble de candidats et on filtre les autres critères.
+        # order : "fans" (décroissants) ou "name" (ordre alphabétique)
+        if order not in ("fans", "name"):
+            raise ValueError(f"Ordre de tri inconnu : {order}")
+        candidates = []  # (identifiants, ordre dans lequel ils sont triés, filtre par intervalle de fans ?)
+        fan_range = min_fans is not None or max_fans is not None
+        if country is not None or genre is not None:
+            candidates.append((self.by_country_genre(country, genre), "fans", False))
+        if prefix:
+            candidates.append((self.by_name_prefix(prefix), "name", False))
+        if fan_range or not candidates:
+            candidates.append((self.by_fans(min_fans, max_fans), "fans", True))
+
+        candidates.sort(key=lambda candidate: len(candidate[0]))
+        artists, sorted_by, _ = candidates[0]
+        for other, _, is_fan_range in candidates[1:]:
+            if is_fan_range:
+                # Plus rapide de comparer la colonne des fans que de croiser avec un grand ensemble
+                fans = self.store.fans[artists]
+                keep = np.ones(len(artists), dtype=bool)
+                if min_fans is not None:
+                    keep &= fans >= min_fans
+                if max_fans is not None:
+                    keep &= fans <= max_fans
+                artists = artists[keep]
+            else:
+                artists = artists[np.isin(artists, other, assume_unique=True)]
+
+        if order != sorted_by:
+            rank = self.fan_rank if order == "fans" else self.name_rank
+            artists = artists[np.argsort(rank[artists], kind="stable")]
+
+        page = artists[offset:offset + limit] if limit is not None else artists[offset:]
+        return {
+            "total": int(len(artists)),
+            "offset": offset,
+            "limit": limit,
+            "results": [self.store.summary(artist) for artist in page.tolist()],
+        }
@@ -0,0 +1,271 @@
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+# Stockage en colonnes des artistes chargés.
+# Au lieu d'un dictionnaire Python par artiste, chaque champ est une colonne compacte :
+# - pays, villes et genres sont internés : une table de valeurs + des codes entiers ;
+# - les chaînes (noms, titres d'albums et de chansons) sont concaténées en UTF-8, avec un tableau d'offsets
+#   (surrogatepass : un demi-caractère isolé, valide en JSON comme "\ud83d", est conservé tel quel) ;
+# - les listes (genres d'un artiste, albums d'un artiste, chansons d'un album) sont aplaties
+#   et délimitées par des offsets : les éléments de l'artiste i sont entre offsets[i] et offsets[i + 1].
+
+def _frozen_view(values, dtype):
+    # Tableau NumPy en lecture seule qui partage la mémoire de values (bytearray ou array), sans copie.
+    # values ne peut plus être agrandi ensuite (BufferError) : un builder ne sert qu'à un seul build().
+    view = np.frombuffer(values, dtype=dtype)
+    view.flags.writeable = False
+    return view
+
+class StringColumn:
+    def __init__(self, data, offsets):
+        self.data = data  # np.uint8 : toutes les chaînes encodées en UTF-8, bout à bout
+        self.offsets = offsets  # np.int64 : len(self) + 1 positions dans data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8", "surrogatepass")
+
+    def slice(self, start, stop):
+        return [self[i] for i in range(start, stop)]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+class StringColumnBuilder:
+    def __init__(self, column=None):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+        if column is not None:
+            # Une seule copie de la colonne existante (pas de passage par tobytes())
+            self.data = bytearray(column.data)
+            self.offsets = array("q")
+            self.offsets.frombytes(column.offsets.view(np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def append(self, value):
+        self.data.extend(value.encode("utf-8", "surrogatepass"))
+        self.offsets.append(len(self.data))
+
+    def extend(self, values):
+        encoded = [value.encode("utf-8", "surrogatepass") for value in values]
+        end = len(self.data)
+        for value in encoded:
+            end += len(value)
+            self.offsets.append(end)
+        self.data.extend(b"".join(encoded))
+
+    def truncate(self, count):
+        # Ne garde que les count premières chaînes
+        del self.data[self.offsets[count]:]
+        del self.offsets[count + 1:]
+
+    def build(self):
+        return StringColumn(_frozen_view(self.data, np.uint8), _frozen_view(self.offsets, np.int64))
+
+class ArtistStore:
+    def __init__(self, names, keys, country_codes, city_codes, fans, genre_offsets, genre_codes,
+                 album_offsets, album_titles, song_offsets, song_titles, countries, cities, genres):
+        self.names = names
+        self.keys = keys  # Identifiant stable de chaque artiste (_id WASABI, ou à défaut son nom)
+        self.country_codes = country_codes  # np.int32, index dans self.countries
+        self.city_codes = city_codes  # np.int32, index dans self.cities
+        self.fans = fans  # np.int64, nombre de fans Deezer
+        self.genre_offsets = genre_offsets
+        self.genre_codes = genre_codes  # np.int32, index dans self.genres
+        self.album_offsets = album_offsets
+        self.album_titles = album_titles
+        self.song_offsets = song_offsets  # Offsets des chansons de chaque album (et non de chaque artiste)
+        self.song_titles = song_titles
+        self.countries = countries  # Tables des valeurs internées, dans l'ordre de première apparition
+        self.cities = cities
+        self.genres = genres
+
+    @staticmethod
+    def empty():
+        return ArtistStoreBuilder().build()
+
+    def __len__(self):
+        return len(self.fans)
+
+    def name(self, i):
+        return self.names[i]
+
+    def country(self, i):
+        return self.countries[self.country_codes[i]]
+
+    def city(self, i):
+        return self.cities[self.city_codes[i]]
+
+    def artist_genres(self, i):
+        start, stop = self.genre_offsets[i], self.genre_offsets[i + 1]
+        return [self.genres[code] for code in self.genre_codes[start:stop]]
+
+    def artist_albums(self, i):
+        albums = {}
+        for album in range(self.album_offsets[i], self.album_offsets[i + 1]):
+            albums[self.album_titles[album]] = self.song_titles.slice(self.song_offsets[album], self.song_offsets[album + 1])
+        return albums
+
+    def record(self, i):
+        # Même format que les anciennes entrées de DataLoader.artist_data
+        return {
+            "name": self.name(i),
+            "location": f"{self.city(i)}, {self.country(i)}",
+            "deezer_fans": int(self.fans[i]),
+            "genres": self.artist_genres(i),
+            "albums": self.artist_albums(i),
+        }
+
+    def summary(self, i):
+        # Version courte (sans albums) utilisée par les requêtes et l'API
+        return {
+            "id": int(i),
+            "name": self.name(i),
+            "city": self.city(i),
+            "country": self.country(i),
+            "deezer_fans": int(self.fans[i]),
+            "genres": self.artist_genres(i),
+        }
+
+    def same_content(self, other):
+        # Mêmes artistes, dans le même ordre et avec les mêmes tables internées
+        arrays = ("country_codes", "city_codes", "fans", "genre_offsets", "genre_codes", "album_offsets", "song_offsets")
+        columns = ("names", "keys", "album_titles", "song_titles")
+        return ((self.countries, self.cities, self.genres) == (other.countries, other.cities, other.genres)
+                and all(np.array_equal(getattr(self, name), getattr(other, name)) for name in arrays)
+                and all(np.array_equal(getattr(self, name).offsets, getattr(other, name).offsets)
+                        and np.array_equal(getattr(self, name).data, getattr(other, name).data) for name in columns))
+
+    @property
+    def nbytes(self):
+        arrays = (self.country_codes, self.city_codes, self.fans, self.genre_offsets, self.genre_codes,
+                  self.album_offsets, self.song_offsets)
+        return (sum(a.nbytes for a in arrays) + self.names.nbytes + self.keys.nbytes
+                + self.album_titles.nbytes + self.song_titles.nbytes)
+
+class ArtistStoreBuilder:
+    # Accumule les artistes dans des tableaux compacts (module array) pendant le chargement,
+    # puis les convertit en tableaux NumPy avec build().
+    def __init__(self, store=None):
+        self.names = StringColumnBuilder(store.names if store else None)
+        self.keys = StringColumnBuilder(store.keys if store else None)
+        self.album_titles = StringColumnBuilder(store.album_titles if store else None)
+        self.song_titles = StringColumnBuilder(store.song_titles if store else None)
+        self.country_codes = array("i")
+        self.city_codes = array("i")
+        self.fans = array("q")
+        self.genre_offsets = array("q", [0])
+        self.genre_codes = array("i")
+        self.album_offsets = array("q", [0])
+        self.song_offsets = array("q", [0])
+        self.countries, self.cities, self.genres = [], [], []
+        self._codes = {"countries": {}, "cities": {}, "genres": {}}
+
+        if store is not None:
+            # Reprend le contenu d'un stockage existant (chargements successifs)
+            for name in ("country_codes", "city_codes", "fans", "genre_codes"):
+                getattr(self, name).frombytes(getattr(store, name).view(np.uint8))
+            for name in ("genre_offsets", "album_offsets", "song_offsets"):
+                setattr(self, name, array("q"))
+                getattr(self, name).frombytes(getattr(store, name).view(np.uint8))
+            for table in ("countries", "cities", "genres"):
+                for value in getattr(store, table):
+                    self._intern(table, value)
+
+    def __len__(self):
+        return len(self.fans)
+
+    def _intern(self, table, value):
+        codes = self._codes[table]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            getattr(self, table).append(value)
+        return code
+
+    def mark(self):
+        # Point de reprise pour rollback() : nombre d'artistes et taille des tables internées
+        return len(self), len(self.countries), len(self.cities), len(self.genres)
+
+    def rollback(self, mark):
+        # Retire tout ce qui a été ajouté depuis mark() (par exemple une page dont un artiste est invalide)
+        count, *table_sizes = mark
+        for name in ("names", "keys"):
+            getattr(self, name).truncate(count)
+        for name in ("country_codes", "city_codes", "fans"):
+            del getattr(self, name)[count:]
+        del self.genre_codes[self.genre_offsets[count]:]
+        del self.genre_offsets[count + 1:]
+        album_count = self.album_offsets[count]
+        del self.album_offsets[count + 1:]
+        self.album_titles.truncate(album_count)
+        self.song_titles.truncate(self.song_offsets[album_count])
+        del self.song_offsets[album_count + 1:]
+        for table, size in zip(("countries", "cities", "genres"), table_sizes):
+            values = getattr(self, table)
+            for value in values[size:]:
+                del self._codes[table][value]
+            del values[size:]
+
+    def append(self, name, city, country, deezer_fans, genres, albums, key=None):
+        # albums : dictionnaire {titre de l'album: [titres des chansons]}
+        self.names.append(name)
+        self.keys.append(name if key is None else key)
+        self.country_codes.append(self._intern("countries", country))
+        self.city_codes.append(self._intern("cities", city))
+        self.fans.append(deezer_fans)
+
+        for genre in genres:
+            self.genre_codes.append(self._intern("genres", genre))
+        self.genre_offsets.append(len(self.genre_codes))
+
+        for album_title, songs in albums.items():
+            self.album_titles.append(album_title)
+            self.song_titles.extend(songs)
+            self.song_offsets.append(len(self.song_titles))
+        self.album_offsets.append(len(self.album_titles))
+
+    def build(self):
+        # Les colonnes NumPy partagent la mémoire des tableaux du builder : aucune copie du stockage
+        # en fin de chargement. Le builder ne doit plus être utilisé ensuite.
+        return ArtistStore(
+            names=self.names.build(),
+            keys=self.keys.build(),
+            country_codes=_frozen_view(self.country_codes, np.int32),
+            city_codes=_frozen_view(self.city_codes, np.int32),
+            fans=_frozen_view(self.fans, np.int64),
+            genre_offsets=_frozen_view(self.genre_offsets, np.int64),
+            genre_codes=_frozen_view(self.genre_codes, np.int32),
+            album_offsets=_frozen_view(self.album_offsets, np.int64),
+            album_titles=self.album_titles.build(),
+            song_offsets=_frozen_view(self.song_offsets, np.int64),
+            song_titles=self.song_titles.build(),
+            countries=list(self.countries),
+            cities=list(self.cities),
+            genres=list(self.genres),
+        )
+
+class ArtistRecords(Sequence):
+    # Vue en lecture seule sur un ArtistStore : chaque élément est reconstruit
+    # à la demande sous forme de dictionnaire (format historique de get_artist_data)
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.store.record(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index d'artiste hors limites")
+        return self.store.record(i)
@@ -1,81 +1,279 @@
+from collections import deque
+import itertools
+import threading
+import time
+
+import aggregations
 from api_client import APIClient
+from artist_store import ArtistStore, ArtistStoreBuilder
+from json_stream import iter_chunks, iter_json_array
+from metrics import REGISTRY
+from snapshot import Snapshot
+import snapshot_io
+
+class RefreshError(RuntimeError):
+    # Rafraîchissement abandonné (pages en erreur) : l'instantané courant est conservé
+    pass
 
 class DataLoader:
-    def __init__(self):
-        self.artist_data = []
-        self.total_artists = 0  # Compteur des artistes
-        self.country_popularity = {}  # Dictionnaire pour stocker la popularité par pays
-        self.genre_popularity_by_country = {}  # Dictionnaire pour stocker la popularité par genre et par pays
-
-    def load_artists(self, max_pages=15):
-        # Utilise la fonction pour récupérer les artistes sur un nombre de pages spécifié
-        all_artists = []
-        
-        for page in range(1, max_pages + 1):  # Pour chaque page jusqu'à max_pages
+    # Nombre de pages en erreur consécutives qui termine un parcours sans max_pages
+    MAX_CONSECUTIVE_FAILURES = 3
+
+    def __init__(self, api_client=None, metrics=None):
+        self.api_client = api_client or APIClient()  # Client HTTP partagé (session, tentatives, parallélisme)
+        self.metrics = metrics or getattr(self.api_client, "metrics", REGISTRY)  # Mesures du chargement (voir metrics.py)
+        self.snapshot = Snapshot.from_store(ArtistStore.empty(), version=0)  # Données courantes (voir Snapshot)
+        self._write_lock = threading.Lock()  # Empêche deux chargements simultanés (les lectures ne le prennent pas)
+
+    # Raccourcis vers l'instantané courant. Pour plusieurs lectures cohérentes entre elles,
+    # lire self.snapshot une fois et l'utiliser directement.
+
+    @property
+    def artist_store(self):
+        return self.snapshot.store  # Artistes stockés en colonnes (voir artist_store.py)
+
+    @property
+    def artist_data(self):
+        return self.snapshot.artist_data  # Vue sous forme de dictionnaires
+
+    @property
+    def total_artists(self):
+        return self.snapshot.total_artists
+
+    @property
+    def country_popularity(self):
+        return self.snapshot.country_popularity
+
+    @property
+    def genre_popularity_by_country(self):
+        return self.snapshot.genre_popularity_by_country
+
+    @property
+    def version(self):
+        return self.snapshot.version  # Change à chaque chargement (invalide les réponses précalculées du serveur)
+
+    def load_artists(self, max_pages=None):
+        # Pipeline en flux : récupération des pages -> décodage JSON incrémental
+        # -> projection de chaque artiste -> stockage en colonnes, puis agrégation.
+        # Chaque page est intégrée au stockage puis libérée : la mémoire ne dépend pas du nombre de pages.
+        # Sans max_pages, on parcourt tout le catalogue jusqu'à la première page vide.
+        # Les pages en erreur sont ignorées ; renvoie leurs numéros (liste vide si le chargement est complet).
+        with self._write_lock, self.metrics.sample_rss() as rss:
+            start = time.perf_counter()
+            builder = ArtistStoreBuilder(self.snapshot.store)
+            failed_pages = []
+            for _ in self._store_pages(builder, max_pages, failed_pages):
+                pass  # Chaque page est déjà dans builder
+            store = builder.build()
+            with self.metrics.timer("dataloader_aggregation_seconds"):
+                self.snapshot = Snapshot.from_store(store, self.snapshot.version + 1)
+            self._record_load("load_artists", start, rss, failed_pages=len(failed_pages))
+            return failed_pages
+
+    def refresh(self, max_pages=None):
+        # Recharge les pages et remplace les données courantes, sans bloquer les lecteurs.
+        # Les agrégats ne sont pas recalculés : on compare chaque artiste (par son identifiant)
+        # à l'instantané courant, et on n'applique que les différences (ajouts, modifications, suppressions).
+        # Renvoie le nombre d'artistes ajoutés, modifiés et supprimés.
+        # Si les données sont identiques, l'instantané courant est conservé (même version).
+        # Si une page est en erreur, ses artistes paraîtraient supprimés : on lève RefreshError
+        # et l'instantané courant est conservé. La fin du catalogue doit donc être une page vide.
+        with self._write_lock, self.metrics.sample_rss() as rss:
+            start = time.perf_counter()
+            old = self.snapshot
+            old_store = old.store
+            unmatched = {key: deque(rows) for key, rows in old.key_rows().items()}
+            country_popularity = {country: dict(data) for country, data in old.country_popularity.items()}
+            genre_popularity_by_country = {country: dict(genres) for country, genres in old.genre_popularity_by_country.items()}
+            genre_occurrences = dict(old.genre_occurrences())
+            totals = (country_popularity, genre_popularity_by_country, genre_occurrences)
+            changes = {"added": 0, "changed": 0, "removed": 0}
+            failed_pages = []
+
+            builder = ArtistStoreBuilder()
+            for artist in itertools.chain.from_iterable(self._store_pages(builder, max_pages, failed_pages)):
+                new = (artist["country"], artist["deezer_fans"], artist["genres"])
+
+                rows = unmatched.get(artist["key"])
+                if not rows:
+                    self._apply_delta(totals, *new, sign=1)
+                    changes["added"] += 1
+                    continue
+                row = rows.popleft()
+                previous = (old_store.country(row), int(old_store.fans[row]), old_store.artist_genres(row))
+                if previous != new:
+                    self._apply_delta(totals, *previous, sign=-1)
+                    self._apply_delta(totals, *new, sign=1)
+                    changes["changed"] += 1
+
+            if failed_pages:
+                raise RefreshError(f"Rafraîchissement abandonné, pages en erreur : {failed_pages}")
+
+            # Les artistes de l'ancien instantané qui n'ont pas été retrouvés ont disparu
+            for rows in unmatched.values():
+                for row in rows:
+                    self._apply_delta(totals, old_store.country(row), int(old_store.fans[row]), old_store.artist_genres(row), sign=-1)
+                    changes["removed"] += 1
+
+            store = builder.build()
+            if not any(changes.values()) and store.same_content(old_store):
+                # Rien n'a changé : l'instantané courant (avec ses index et ses réponses précalculées) reste valable
+                self._record_load("refresh", start, rss, **changes)
+                return changes
+            with self.metrics.timer("dataloader_aggregation_seconds"):
+                # Seuls les index sont reconstruits : les agrégats viennent d'être mis à jour par différence
+                self.snapshot = Snapshot(store, country_popularity, genre_popularity_by_country,
+                                         old.version + 1, genre_occurrences)
+            self._record_load("refresh", start, rss, **changes)
+            return changes
+
+    def _record_load(self, event, start, rss, **fields):
+        # Durée totale, taille des données et pic de mémoire pendant l'opération, puis une ligne de journal structuré
+        elapsed = time.perf_counter() - start
+        self.metrics.observe("dataloader_load_seconds", elapsed, operation=event)
+        self.metrics.set("dataloader_artists", len(self.snapshot.store))
+        peak_rss, rss_increase = self.metrics.record_rss(rss, operation=event)
+        self.metrics.log(event, seconds=round(elapsed, 6), artists=len(self.snapshot.store), version=self.snapshot.version,
+                         peak_rss_bytes=peak_rss, rss_increase_bytes=rss_increase, **fields)
+
+    def save_snapshot(self, directory):
+        # Sauvegarde l'instantané courant au format binaire (voir snapshot_io.py)
+        snapshot_io.save_snapshot(self.snapshot, directory)
+
+    def load_snapshot(self, directory, verify=True):
+        # Remplace les données courantes par un instantané sauvegardé, sans aucun appel réseau.
+        # Lève snapshot_io.SnapshotError si l'instantané est absent, corrompu ou d'un autre schéma.
+        snapshot = snapshot_io.load_snapshot(directory, verify)
+        with self._write_lock:
+            self.snapshot = snapshot
+
+    @staticmethod
+    def _apply_delta(totals, country, deezer_fans, genres, sign):
+        # Ajoute (sign=1) ou retire (sign=-1) la contribution d'un artiste aux agrégats
+        country_popularity, genre_popularity_by_country, genre_occurrences = totals
+        data = country_popularity.setdefault(country, {"artist_count": 0, "total_popularity": 0})
+        data["artist_count"] += sign
+        data["total_popularity"] += sign * deezer_fans
+        country_genres = genre_popularity_by_country.setdefault(country, {})
+
+        for genre in genres:
+            genre_occurrences[country, genre] = genre_occurrences.get((country, genre), 0) + sign
+            country_genres[genre] = country_genres.get(genre, 0) + sign * deezer_fans
+            if genre_occurrences[country, genre] == 0:
+                # Plus aucun artiste de ce genre dans ce pays
+                del genre_occurrences[country, genre]
+                del country_genres[genre]
+
+        if data["artist_count"] == 0:
+            # Plus aucun artiste dans ce pays
+            del country_popularity[country]
+            del genre_popularity_by_country[country]
+
+    def _store_pages(self, builder, max_pages, failed_pages=None):
+        # Ajoute les artistes à builder page par page, et renvoie ceux de chaque page une fois ajoutés
+        # (liste d'artistes projetés, voir _project_artist).
+        # Une page en erreur (réseau, JSON invalide, artiste invalide) est ignorée en entier
+        # et ajoutée à failed_pages.
+        # Sans max_pages, on s'arrête à la première page vide (fin du catalogue) ou après
+        # MAX_CONSECUTIVE_FAILURES pages en erreur d'affilée : serveur injoignable, ou API qui
+        # répond aux pages hors catalogue par une erreur plutôt que par une liste vide.
+        pages = range(1, max_pages + 1) if max_pages is not None else itertools.count(1)
+        consecutive_failures = 0
+        for page, content in self.api_client.fetch_page_contents(pages):
             print(f"Récupération des artistes de la page {page}...")
-            artists = APIClient.fetch_all_artists(page)
-            
-            if artists:
-                all_artists.extend(artists)  # Ajouter les artistes récupérés à la liste finale
-
-        if all_artists:
-            # Traite les artistes récupérés
-            for artist_details in all_artists:
-                location = artist_details.get("location", {})
-                city = location.get("city", "Inconnu")
-                country = location.get("country", "Inconnu")
-                deezer_fans = artist_details.get("deezerFans", 0)
-                genres = artist_details.get("genres", [])
-                
-                # Récupérer les albums et les titres des musiques
-                albums = artist_details.get("albums", [])
-                artist_albums = {}
-                
-                for album in albums:
-                    album_title = album.get("title", "Inconnu")  # Utilisation du champ 'title' pour le nom de l'album
-                    album_songs = album.get("songs", [])
-                    song_titles = [song.get("title", "Inconnu") for song in album_songs]  # Extraction des titres des chansons
-                    artist_albums[album_title] = song_titles  # Associer chaque album à ses titres de musique
-                
-                # Ajouter l'artiste aux données
-                self.artist_data.append({
-                    "name": artist_details["name"],
-                    "location": f"{city}, {country}",
-                    "deezer_fans": deezer_fans,
-                    "genres": genres,
-                    "albums": artist_albums  # Ajout des albums et des titres
-                })
-                
-                # Calculer la popularité par pays
-                if country not in self.country_popularity:
-                    self.country_popularity[country] = {
-                        "artist_count": 0,
-                        "total_popularity": 0
-                    }
-                
-                self.country_popularity[country]["artist_count"] += 1
-                self.country_popularity[country]["total_popularity"] += deezer_fans
-
-                # Calculer la popularité par genre et par pays
-                if country not in self.genre_popularity_by_country:
-                    self.genre_popularity_by_country[country] = {}
-
-                for genre in genres:
-                    if genre not in self.genre_popularity_by_country[country]:
-                        self.genre_popularity_by_country[country][genre] = 0
-                    self.genre_popularity_by_country[country][genre] += deezer_fans
-                
-            # Mettre à jour le compteur avec le nombre d'artistes récupérés
-            self.total_artists += len(all_artists)
+            artists = self._store_page(builder, page, content) if content is not None else None
+            if artists is None:
+                # Page en erreur (déjà signalée) : on passe à la suivante
+                if failed_pages is not None:
+                    failed_pages.append(page)
+                consecutive_failures += 1
+                if max_pages is None and consecutive_failures >= DataLoader.MAX_CONSECUTIVE_FAILURES:
+                    print(f"{consecutive_failures} pages en erreur d'affilée : arrêt du parcours à la page {page}")
+                    break
+                continue
+            consecutive_failures = 0
+            if not artists and max_pages is None:
+                break  # Fin du catalogue
+            yield artists
+
+    def _store_page(self, builder, page, content):
+        # Décode, projette et ajoute toute la page, ou rien : une page invalide (page d'erreur HTML,
+        # corps tronqué, artiste sans nom ou avec un champ d'un type inattendu) est retirée de builder.
+        # Seuls les artistes projetés d'une page sont gardés en mémoire, pas les objets JSON complets.
+        # Renvoie None si la page est invalide.
+        mark = builder.mark()
+        try:
+            # Seul le décodage est chronométré, pas la projection
+            artists = self.metrics.timed_iter(iter_json_array(iter_chunks(content)), "dataloader_parse_seconds")
+            artists = [self._project_artist(artist_details) for artist_details in artists]
+            for artist in artists:
+                self._store_artist(builder, artist)
+            return artists
+        except (ValueError, TypeError, KeyError, AttributeError, OverflowError) as e:
+            builder.rollback(mark)
+            self.api_client.discard_page(page)
+            self.metrics.inc("wasabi_pages_total", source="error")
+            print(f"Page {page} invalide, ignorée : {e}")
+            return None
+
+    @staticmethod
+    def _project_artist(artist_details):
+        # Ne garde que les champs utilisés par l'application
+        location = artist_details.get("location") or {}
+        city = location.get("city", "Inconnu")
+        country = location.get("country", "Inconnu")
+
+        # Récupérer les albums et les titres des musiques
+        artist_albums = {}
+        for album in artist_details.get("albums") or []:
+            album_title = album.get("title") or "Inconnu"  # Utilisation du champ 'title' pour le nom de l'album
+            album_songs = album.get("songs") or []
+            artist_albums[album_title] = [song.get("title") or "Inconnu" for song in album_songs]  # Extraction des titres des chansons
+
+        return {
+            "key": str(artist_details.get("_id") or artist_details["name"]),  # Identifiant utilisé par refresh()
+            "name": artist_details["name"],
+            "city": city,
+            "country": country,
+            "deezer_fans": int(artist_details.get("deezerFans") or 0),  # Peut être un flottant (3.0) dans le JSON
+            "genres": artist_details.get("genres") or [],
+            "albums": artist_albums,
+        }
+
+    @staticmethod
+    def _store_artist(builder, artist):
+        builder.append(artist["name"], artist["city"], artist["country"], artist["deezer_fans"], artist["genres"], artist["albums"], artist["key"])
 
     def get_artist_data(self):
-        return self.artist_data
-    
+        return self.snapshot.artist_data
+
     def get_total_artists(self):
-        return self.total_artists
+        return self.snapshot.total_artists
 
     def get_country_popularity(self):
-        return self.country_popularity
+        return self.snapshot.country_popularity
 
     def get_genre_popularity_by_country(self):
-        return self.genre_popularity_by_country
+        return self.snapshot.genre_popularity_by_country
+
+    # Requêtes sur les données chargées (calculées à la demande, voir aggregations.py)
+
+    def get_top_artists(self, n=10, country=None, genre=None):
+        return aggregations.top_artists(self.snapshot.store, n, country, genre)
+
+    def get_top_artists_by_country(self, n=10):
+        return aggregations.top_artists_by_country(self.snapshot.store, n)
+
+    def get_top_artists_by_genre(self, n=10):
+        return aggregations.top_artists_by_genre(self.snapshot.store, n)
+
+    def get_fan_histogram(self, bins=None, country=None, genre=None):
+        return aggregations.fan_histogram(self.snapshot.store, bins, country, genre)
+
+    def get_genre_share_by_country(self):
+        return aggregations.genre_share_by_country(self.snapshot.store)
+
+    def search_artists(self, prefix=None, country=None, genre=None, min_fans=None, max_fans=None, order="fans", offset=0, limit=20):
+        # Recherche paginée par les index construits au chargement (voir artist_index.py) :
+        # {"total": ..., "offset": ..., "limit": ..., "results": [artistes]}
+        return self.snapshot.index.search(prefix, country, genre, min_fans, max_fans, order, offset, limit)
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+import time
+
+class ResponseCache:
+    # Cache disque des réponses HTTP, indexé par URL.
+    # - une entrée plus récente que ttl secondes est servie sans aucun appel réseau ;
+    # - une entrée expirée est revalidée par une requête conditionnelle (If-None-Match / If-Modified-Since) ;
+    # - la taille totale des corps est bornée par max_bytes, les entrées les moins récemment utilisées sont évincées.
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory, ttl=24 * 3600, max_bytes=512 * 1024 * 1024, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._counters = {
+            "hits": 0,  # Réponses servies depuis le cache sans appel réseau
+            "revalidations": 0,  # Réponses 304 : entrée expirée mais toujours valide
+            "misses": 0,  # Pages absentes du cache, illisibles, ou expirées et retéléchargées en entier
+            "evictions": 0,
+            "bytes_from_cache": 0,
+            "bytes_from_network": 0,
+        }
+        os.makedirs(directory, exist_ok=True)
+        self._entries = self._read_index()  # {clé: métadonnées}, de la moins à la plus récemment utilisée
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f"{key}.body")
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, ResponseCache.INDEX_FILE), encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return OrderedDict()
+        # Ignore les entrées dont le fichier a disparu
+        return OrderedDict((k, v) for k, v in entries if os.path.exists(self._body_path(k)))
+
+    def _write_index(self):
+        path = os.path.join(self.directory, ResponseCache.INDEX_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.items()), f)
+        os.replace(tmp_path, path)  # Remplacement atomique de l'index
+        self._dirty = False
+
+    def get(self, url):
+        # Renvoie les métadonnées de l'entrée (ou None) et la marque comme récemment utilisée
+        key = ResponseCache.key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            return dict(entry, key=key)
+
+    def record_miss(self):
+        # Entrée expirée mais page modifiée (réponse 200 à la requête conditionnelle) : le cache n'a rien évité
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def is_fresh(self, entry):
+        return self.clock() - entry["stored_at"] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def read(self, entry, revalidated=False):
+        # Lit le corps d'une entrée ; renvoie None si le fichier n'est plus lisible
+        try:
+            with open(self._body_path(entry["key"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            with self._lock:
+                self._entries.pop(entry["key"], None)
+                self._counters["misses"] += 1
+                self._dirty = True
+            return None
+        with self._lock:
+            self._counters["revalidations" if revalidated else "hits"] += 1
+            self._counters["bytes_from_cache"] += len(body)
+        return body
+
+    def revalidate(self, entry):
+        # Le serveur a répondu 304 : l'entrée repart pour une durée ttl
+        with self._lock:
+            stored = self._entries.get(entry["key"])
+            if stored is not None:
+                stored["stored_at"] = self.clock()
+                self._write_index()
+        return self.read(entry, revalidated=True)
+
+    def put(self, url, body, etag=None, last_modified=None):
+        key = ResponseCache.key(url)
+        with self._lock:
+            self._counters["bytes_from_network"] += len(body)
+            if len(body) > self.max_bytes:
+                return
+            tmp_path = f"{self._body_path(key)}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, self._body_path(key))
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "stored_at": self.clock(),
+                "size": len(body),
+            }
+            self._evict()
+            self._write_index()
+
+    def discard(self, url):
+        # Supprime l'entrée d'une URL, par exemple quand son corps s'avère invalide
+        key = ResponseCache.key(url)
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            self._write_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._entries.values())
+        while total > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)  # Entrée la moins récemment utilisée
+            total -= entry["size"]
+            self._counters["evictions"] += 1
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def flush(self):
+        # Sauvegarde l'ordre d'utilisation (LRU) mis à jour par les lectures
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["size_bytes"] = sum(entry["size"] for entry in self._entries.values())
+        return stats
@@ -0,0 +1,82 @@
+import codecs
+import json
+
+# Décodage incrémental d'un tableau JSON : les éléments sont renvoyés un par un
+# dès qu'ils sont complets, sans construire la liste entière en mémoire.
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\r\n"
+DELIMITERS = WHITESPACE + ",]"
+
+def iter_chunks(content, chunk_size=CHUNK_SIZE):
+    # Découpe un corps déjà téléchargé en morceaux, sans copie (memoryview)
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+def iter_json_array(chunks):
+    # chunks : itérable de morceaux d'octets UTF-8 formant un tableau JSON
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer, pos = "", 0
+    expect = "["  # "[" au début, puis "value_or_end", "separator" ou "value"
+
+    def refill(minimum_size):
+        # Ajoute des morceaux au tampon jusqu'à atteindre minimum_size caractères ;
+        # renvoie False si le flux est épuisé
+        nonlocal buffer, pos
+        parts = [buffer[pos:]]
+        size = len(parts[0])
+        extended = False
+        while size < minimum_size or not extended:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            text = utf8.decode(bytes(chunk))
+            parts.append(text)
+            size += len(text)
+            extended = True
+        buffer, pos = "".join(parts), 0
+        return extended
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if not refill(1):
+                raise ValueError("Tableau JSON incomplet")
+            continue
+
+        char = buffer[pos]
+        if expect == "[":
+            if char != "[":
+                raise ValueError("Un tableau JSON est attendu")
+            pos += 1
+            expect = "value_or_end"
+            continue
+        if char == "]" and expect in ("value_or_end", "separator"):
+            return
+        if expect == "separator":
+            if char != ",":
+                raise ValueError(f"',' ou ']' attendu à la position {pos}")
+            pos += 1
+            expect = "value"
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Élément incomplet : on double au moins la taille du tampon avant de réessayer,
+            # pour que le coût reste linéaire même pour un très gros élément
+            if not refill(2 * (len(buffer) - pos)):
+                raise
+            continue
+        if not isinstance(item, (dict, list, str)) and (end == len(buffer) or buffer[end] not in DELIMITERS):
+            # Un nombre coupé en fin de tampon ("-3." pour "-3.5e2") se décode partiellement :
+            # on attend la suite avant de le renvoyer
+            if refill(len(buffer) - pos + 1):
+                continue
+        yield item
+        pos = end
+        expect = "separator"
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Mesures du chargement et du service des données : compteurs, jauges et résumés
+# (nombre, somme, maximum). Exportables au format texte de Prometheus (endpoint /metrics)
+# ou sous forme de journaux structurés (une ligne JSON par événement).
+
+logger = logging.getLogger("wasabi.metrics")
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+DESCRIPTIONS = {
+    "wasabi_page_fetch_seconds": "Durée des appels HTTP vers WASABI, par page",
+    "wasabi_bytes_downloaded_total": "Octets téléchargés depuis WASABI (corps des réponses)",
+    "wasabi_pages_total": "Pages obtenues, par source (network, cache, revalidated, error)",
+    "dataloader_parse_seconds": "Temps de décodage JSON, par page",
+    "dataloader_aggregation_seconds": "Temps de calcul des agrégats et des index",
+    "dataloader_load_seconds": "Durée totale des chargements et rafraîchissements",
+    "dataloader_artists": "Nombre d'artistes dans l'instantané courant",
+    "dataloader_peak_rss_bytes": "Pic de mémoire résidente pendant le dernier chargement",
+    "dataloader_rss_increase_bytes": "Hausse de la mémoire résidente pendant le dernier chargement (pic moins début)",
+    "http_requests_total": "Requêtes servies, par route et code HTTP",
+    "http_request_seconds": "Durée de traitement des requêtes, par route",
+}
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+def current_rss():
+    # Mémoire résidente actuelle du processus, ou None si elle n'est pas disponible (hors Linux)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RSSSampler:
+    # Mesure la mémoire résidente dans un thread pendant une opération, pour en connaître le pic.
+    # ru_maxrss ne convient pas : c'est le pic depuis le démarrage du processus, pas celui de l'opération.
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.baseline = current_rss()  # Au début de l'opération
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = None
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def stop(self):
+        # Arrête l'échantillonnage (plusieurs appels possibles) ; renvoie (début, pic)
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._sample()
+        return self.baseline, self.peak
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._summaries = {}  # {clé: [nombre, somme, maximum]}
+        self._help = dict(DESCRIPTIONS)
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.setdefault(key, [0, 0.0, value])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, name, **labels):
+        # Comme timer(), mais ne mesure que le temps passé à produire les éléments d'un itérateur
+        # (et non le temps passé par l'appelant à les traiter)
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.observe(name, elapsed, **labels)
+
+    def sample_rss(self, interval=0.01):
+        # À utiliser avec with ; voir record_rss
+        return RSSSampler(interval)
+
+    def record_rss(self, sampler, **labels):
+        # Pic de mémoire résidente pendant l'opération échantillonnée, et sa hausse depuis le début
+        baseline, peak = sampler.stop()
+        if peak is None:
+            return None, None
+        self.set("dataloader_peak_rss_bytes", peak, **labels)
+        self.set("dataloader_rss_increase_bytes", peak - baseline, **labels)
+        return peak, peak - baseline
+
+    def get(self, name, **labels):
+        # Valeur d'un compteur ou d'une jauge, ou (nombre, somme, maximum) d'un résumé
+        key = _key(name, labels)
+        with self._lock:
+            if key in self._summaries:
+                return tuple(self._summaries[key])
+            return self._counters.get(key, self._gauges.get(key))
+
+    def as_dict(self):
+        with self._lock:
+            result = {}
+            for (name, labels), value in list(self._counters.items()) + list(self._gauges.items()):
+                result[name + _format_labels(labels)] = value
+            for (name, labels), (count, total, maximum) in self._summaries.items():
+                result[name + _format_labels(labels)] = {"count": count, "sum": total, "max": maximum}
+            return result
+
+    def log(self, event, **fields):
+        # Journal structuré : l'événement, ses champs, puis l'état de toutes les mesures
+        logger.info(json.dumps({"event": event, **fields, "metrics": self.as_dict()}, default=str))
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            for kind, values in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted({name for name, _ in values}):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for (metric, labels), value in sorted(values.items()):
+                        if metric == name:
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._summaries}):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} summary")
+                for (metric, labels), (count, total, maximum) in sorted(self._summaries.items()):
+                    if metric == name:
+                        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"# TYPE {name}_max gauge")
+                for (metric, labels), (count, total, maximum) in sorted(self._summaries.items()):
+                    if metric == name:
+                        lines.append(f"{name}_max{_format_labels(labels)} {maximum}")
+        return "\n".join(lines) + "\n"
+
+# Mesures partagées par défaut entre APIClient, DataLoader et le serveur
+REGISTRY = Metrics()
@@ -0,0 +1,38 @@
+import random
+
+from wasabi_stub import COUNTRIES, GENRES
+
+# Données et calculs de référence communs aux tests (tests/) et aux benchmarks (benchmarks/) :
+# - random_artists : artistes synthétiques, au format des arguments de ArtistStoreBuilder.append ;
+# - legacy_aggregates : l'ancien calcul des agrégats de DataLoader.load_artists (dictionnaires imbriqués,
+#   un artiste et un genre à la fois), auquel les calculs vectorisés et incrémentaux sont comparés.
+
+NAMES = ["Édith", "edgar", "Eden", "Daft", "dalida", "Zaz", "Ömer", "abba", "Abbey"]  # Casses et accents variés
+
+def random_artists(count, seed=0, max_fans=10_000):
+    # (nom, ville, pays, fans, genres, albums), avec de nombreuses égalités de fans,
+    # des genres répétés pour un même artiste et le pays par défaut "Inconnu"
+    rng = random.Random(seed)
+    countries = COUNTRIES + ["Inconnu"]
+    artists = []
+    for i in range(count):
+        genres = [rng.choice(GENRES) for _ in range(rng.randint(0, 3))]
+        fans = rng.choice([0, 500, 500, rng.randint(0, max_fans)])
+        artists.append((f"{rng.choice(NAMES)} {i}", "City", rng.choice(countries), fans, genres, {}))
+    return artists
+
+def legacy_aggregates(artists):
+    country_popularity = {}
+    genre_popularity_by_country = {}
+    for _, _, country, deezer_fans, genres, _ in artists:
+        if country not in country_popularity:
+            country_popularity[country] = {"artist_count": 0, "total_popularity": 0}
+        country_popularity[country]["artist_count"] += 1
+        country_popularity[country]["total_popularity"] += deezer_fans
+        if country not in genre_popularity_by_country:
+            genre_popularity_by_country[country] = {}
+        for genre in genres:
+            if genre not in genre_popularity_by_country[country]:
+                genre_popularity_by_country[country][genre] = 0
+            genre_popularity_by_country[country][genre] += deezer_fans
+    return country_popularity, genre_popularity_by_country
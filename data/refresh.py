@@ -0,0 +1,60 @@
+import threading
+
+class RefreshScheduler:
+    # Rafraîchit périodiquement les données d'un DataLoader dans un thread d'arrière-plan.
+    # Pendant un rafraîchissement, les requêtes continuent d'être servies avec l'instantané
+    # courant ; le nouvel instantané le remplace en une seule affectation (voir DataLoader.refresh).
+    # Avec un ResponseCache, les pages encore fraîches sont relues depuis le disque :
+    # c'est le ttl du cache qui décide de ce qui est réellement revalidé auprès de l'API.
+    # Il ne doit donc pas dépasser interval, sinon les rafraîchissements ne voient aucun changement.
+    def __init__(self, data_loader, interval=3600, max_pages=None, on_refresh=None):
+        self.data_loader = data_loader
+        self.on_refresh = on_refresh  # Appelé avec les changements quand un rafraîchissement a remplacé l'instantané
+        self.interval = interval  # Secondes entre deux rafraîchissements
+        self.max_pages = max_pages
+        self.last_changes = None  # Résultat du dernier rafraîchissement réussi
+        self.refresh_count = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def trigger(self):
+        # Demande un rafraîchissement immédiat, sans attendre la fin de l'intervalle
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh_once()
+
+    def refresh_once(self):
+        version = self.data_loader.version
+        try:
+            changes = self.data_loader.refresh(self.max_pages)
+        except Exception as e:
+            # Une erreur ne doit pas arrêter le thread : on garde l'instantané courant
+            print(f"Erreur lors du rafraîchissement des artistes : {e}")
+            return None
+        self.last_changes = changes
+        self.refresh_count += 1
+        print(f"Rafraîchissement terminé : {changes['added']} ajoutés, {changes['changed']} modifiés, {changes['removed']} supprimés")
+        if self.on_refresh is not None and self.data_loader.version != version:
+            try:
+                self.on_refresh(changes)
+            except Exception as e:
+                print(f"Erreur après le rafraîchissement des artistes : {e}")
+        return changes
@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import Flask, Response, abort, g, jsonify, request
+
+try:
+    import brotli  # Optionnel : pip install brotli
+except ImportError:
+    brotli = None
+
+from api_client import APIClient
+from app import CACHE_DIR
+from data_loader import DataLoader
+from http_cache import ResponseCache
+from metrics import REGISTRY
+from refresh import RefreshScheduler
+from snapshot_io import SnapshotError
+
+# Répertoire de l'instantané binaire des données (voir snapshot_io.py)
+SNAPSHOT_DIR = os.path.join(os.path.dirname(CACHE_DIR), "snapshot")
+REFRESH_INTERVAL = 3600  # Secondes entre deux rafraîchissements en arrière-plan
+
+MAX_SEARCH_LIMIT = 100  # Nombre maximal d'artistes par page de résultats de recherche
+
+# Serveur Flask de l'application : les données sont chargées une seule fois au démarrage,
+# puis chaque réponse JSON est sérialisée, compressée et étiquetée (ETag) une seule fois
+# par version des données.
+
+class Payload:
+    def __init__(self, data):
+        try:
+            self.identity = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except UnicodeEncodeError:
+            # Demi-caractère isolé dans un nom (voir artist_store.py) : échappé en \uXXXX
+            self.identity = json.dumps(data, separators=(",", ":")).encode("ascii")
+        digest = hashlib.sha256(self.identity).hexdigest()[:32]
+        # Une ETag forte par représentation (le corps compressé n'est pas le même octet par octet)
+        self.bodies = {"identity": self.identity, "gzip": gzip.compress(self.identity, mtime=0)}
+        self.etags = {"identity": f'"{digest}"', "gzip": f'"{digest}-gzip"'}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(self.identity)
+            self.etags["br"] = f'"{digest}-br"'
+
+class PrecomputedResponses:
+    # Cache des réponses par chemin, invalidé quand la version des données change
+    def __init__(self, data_loader):
+        self.data_loader = data_loader
+        self.serializations = 0  # Nombre de réponses effectivement sérialisées (utile pour les tests)
+        self._payloads = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        # build(snapshot) construit les données à sérialiser ; renvoie None si la ressource n'existe pas.
+        # Tout est calculé sur un seul instantané, même si un rafraîchissement a lieu en même temps.
+        snapshot = self.data_loader.snapshot
+        version = snapshot.version
+        payload = self._payloads.get(key) if self._version == version else None
+        if payload is not None:
+            return payload
+        with self._lock:
+            if self._version != version:
+                self._payloads = {}
+                self._version = version
+            if key not in self._payloads:
+                data = build(snapshot)
+                if data is None:
+                    return None  # Ressource inexistante : rien n'est mis en cache
+                self._payloads[key] = Payload(data)
+                self.serializations += 1
+            return self._payloads[key]
+
+def choose_encoding(payload):
+    # Préférence : brotli, puis gzip, puis aucune compression (selon l'en-tête Accept-Encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in payload.bodies and request.accept_encodings[encoding]:
+            return encoding
+    return "identity"
+
+def send_payload(payload):
+    if payload is None:
+        abort(404)
+    encoding = choose_encoding(payload)
+    etag = payload.etags[encoding]
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    # Le navigateur a déjà cette représentation : 304 sans corps
+    if request.if_none_match.contains_weak(etag.strip('"')):
+        return Response(status=304, headers=headers)
+    return Response(payload.bodies[encoding], mimetype="application/json", headers=headers)
+
+def country_map(snapshot):
+    # Format attendu par src/visualizations/world_map.js
+    return [
+        {"country": country, "popularity": data["total_popularity"], "artist_count": data["artist_count"]}
+        for country, data in snapshot.country_popularity.items()
+    ]
+
+def country_genres(snapshot, country):
+    genres = snapshot.genre_popularity_by_country.get(country)
+    if genres is None:
+        return None
+    return [
+        {"genre": genre, "popularity": popularity}
+        for genre, popularity in sorted(genres.items(), key=lambda item: -item[1])
+    ]
+
+def genre_artists(snapshot, country, genre):
+    if genre not in snapshot.genre_popularity_by_country.get(country, {}):
+        return None
+    # L'index (pays, genre) est déjà trié par fans décroissants
+    return [snapshot.store.summary(artist) for artist in snapshot.index.by_country_genre(country, genre).tolist()]
+
+def create_app(data_loader, metrics=None):
+    app = Flask(__name__)
+    responses = PrecomputedResponses(data_loader)
+    app.extensions["precomputed_responses"] = responses
+    metrics = metrics or getattr(data_loader, "metrics", REGISTRY)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        # Étiquette par modèle de route (et non par URL) pour garder un nombre de séries borné
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        metrics.inc("http_requests_total", route=route, status=response.status_code)
+        metrics.observe("http_request_seconds", time.perf_counter() - g.request_start, route=route)
+        return response
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        # Format texte de Prometheus
+        return Response(metrics.to_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    # La carte est demandée à chaque chargement de page : on la prépare dès le démarrage
+    responses.get("artists", country_map)
+
+    @app.route("/api/artists")
+    def artists():
+        return send_payload(responses.get("artists", country_map))
+
+    @app.route("/api/countries/<country>/genres")
+    def genres(country):
+        return send_payload(responses.get(("genres", country), lambda snapshot: country_genres(snapshot, country)))
+
+    @app.route("/api/countries/<country>/genres/<genre>/artists")
+    def artists_by_genre(country, genre):
+        return send_payload(responses.get(("artists", country, genre), lambda snapshot: genre_artists(snapshot, country, genre)))
+
+    @app.route("/api/artists/search")
+    def search_artists():
+        # Recherche paginée (panneau de détails) : non précalculée, les index la rendent peu coûteuse
+        args = request.args
+        order = args.get("order", "fans")
+        if order not in ("fans", "name"):
+            abort(400)
+        result = data_loader.snapshot.index.search(
+            prefix=args.get("prefix"),
+            country=args.get("country"),
+            genre=args.get("genre"),
+            min_fans=args.get("min_fans", type=int),
+            max_fans=args.get("max_fans", type=int),
+            order=order,
+            offset=max(args.get("offset", 0, type=int), 0),
+            limit=min(max(args.get("limit", 20, type=int), 1), MAX_SEARCH_LIMIT),
+        )
+        return jsonify(result)
+
+    return app
+
+def load_initial_data(data_loader, snapshot_dir=SNAPSHOT_DIR):
+    # Démarrage rapide depuis le dernier instantané sauvegardé, sinon chargement depuis l'API
+    try:
+        data_loader.load_snapshot(snapshot_dir)
+    except SnapshotError as e:
+        print(f"Instantané indisponible ({e}), chargement depuis l'API...")
+        failed_pages = data_loader.load_artists()
+        if failed_pages:
+            # Données incomplètes (API injoignable ?) : servies, mais jamais sauvegardées
+            print(f"Chargement incomplet (pages en erreur : {failed_pages}), instantané non sauvegardé")
+        else:
+            data_loader.save_snapshot(snapshot_dir)
+
+def main():
+    # Les pages WASABI déjà téléchargées sont relues depuis le même cache disque que app.py.
+    # Elles sont considérées périmées après un intervalle de rafraîchissement : chaque rafraîchissement
+    # les revalide donc auprès de l'API (réponse 304 si elles n'ont pas changé).
+    api_client = APIClient(cache=ResponseCache(CACHE_DIR, ttl=REFRESH_INTERVAL))
+    data_loader = DataLoader(api_client=api_client)
+    load_initial_data(data_loader)
+
+    # Les données sont rafraîchies en arrière-plan, sans interrompre le service.
+    # Chaque nouvel instantané (donc complet, voir DataLoader.refresh) est sauvegardé pour le prochain démarrage.
+    scheduler = RefreshScheduler(data_loader, interval=REFRESH_INTERVAL,
+                                 on_refresh=lambda changes: data_loader.save_snapshot(SNAPSHOT_DIR)).start()
+    try:
+        create_app(data_loader).run()
+    finally:
+        scheduler.stop()
+        api_client.close()
+
+if __name__ == "__main__":
+    main()
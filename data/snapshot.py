@@ -0,0 +1,47 @@
+import aggregations
+from artist_index import ArtistIndex
+from artist_store import ArtistRecords
+
+class Snapshot:
+    # État complet et immuable des données chargées : le stockage des artistes et les agrégats
+    # calculés dessus. DataLoader remplace son instantané d'un seul coup (une affectation),
+    # si bien qu'un lecteur qui garde une référence à un instantané ne voit jamais d'agrégats
+    # à moitié mis à jour, et n'attend jamais de verrou.
+    def __init__(self, store, country_popularity, genre_popularity_by_country, version, genre_occurrences=None, index=None):
+        self.store = store
+        self.index = index if index is not None else ArtistIndex.build(store)  # Index de recherche (voir artist_index.py)
+        self.artist_data = ArtistRecords(store)
+        self.country_popularity = country_popularity
+        self.genre_popularity_by_country = genre_popularity_by_country
+        self.version = version
+        self._genre_occurrences = genre_occurrences
+        self._key_rows = None
+
+    @staticmethod
+    def from_store(store, version):
+        # Popularité par pays, et par genre et par pays : un group-by vectorisé sur les colonnes
+        return Snapshot(
+            store,
+            aggregations.country_popularity(store),
+            aggregations.genre_popularity_by_country(store),
+            version,
+        )
+
+    @property
+    def total_artists(self):
+        return len(self.store)
+
+    def genre_occurrences(self):
+        # {(pays, genre): nombre d'occurrences}, pour savoir quand un genre disparaît d'un pays
+        if self._genre_occurrences is None:
+            self._genre_occurrences = aggregations.genre_occurrences_by_country(self.store)
+        return self._genre_occurrences
+
+    def key_rows(self):
+        # {clé de l'artiste: lignes du stockage}, calculé une seule fois par instantané
+        if self._key_rows is None:
+            key_rows = {}
+            for row in range(len(self.store)):
+                key_rows.setdefault(self.store.keys[row], []).append(row)
+            self._key_rows = key_rows
+        return self._key_rows
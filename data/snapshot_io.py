@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from artist_index import INDEX_ARRAYS, ArtistIndex
+from artist_store import ArtistStore, StringColumn
+from snapshot import Snapshot
+
+# Format binaire des instantanés (voir snapshot.py), pour démarrer sans appel réseau
+# ni décodage JSON des pages WASABI. Un instantané est un répertoire contenant :
+# - un fichier .npy par colonne du stockage, relu en mémoire partagée (np.load avec mmap_mode) ;
+# - un fichier .npy par index de recherche (voir artist_index.py), pour ne pas les reconstruire ;
+# - manifest.json : version du schéma, empreinte SHA-256 et forme de chaque colonne,
+#   tables des valeurs internées (pays, villes, genres) et agrégats déjà calculés.
+
+FORMAT = "wasabi-artist-snapshot"
+SCHEMA_VERSION = 2  # 2 : ajout des index de recherche (artist_index.py)
+MANIFEST_FILE = "manifest.json"
+
+STRING_COLUMNS = ("names", "keys", "album_titles", "song_titles")
+ARRAY_COLUMNS = ("country_codes", "city_codes", "fans", "genre_offsets", "genre_codes", "album_offsets", "song_offsets")
+TABLES = ("countries", "cities", "genres")
+INDEX_COLUMNS = tuple(f"index.{name}" for name in INDEX_ARRAYS) + ("index.sorted_names.data", "index.sorted_names.offsets")
+
+class SnapshotError(ValueError):
+    # Instantané absent, incomplet, corrompu ou d'une version de schéma non prise en charge
+    pass
+
+def _arrays(snapshot):
+    arrays = {name: getattr(snapshot.store, name) for name in ARRAY_COLUMNS}
+    for name in STRING_COLUMNS:
+        column = getattr(snapshot.store, name)
+        arrays[f"{name}.data"] = column.data
+        arrays[f"{name}.offsets"] = column.offsets
+    for name in INDEX_ARRAYS:
+        arrays[f"index.{name}"] = getattr(snapshot.index, name)
+    arrays["index.sorted_names.data"] = snapshot.index.sorted_names.data
+    arrays["index.sorted_names.offsets"] = snapshot.index.sorted_names.offsets
+    return arrays
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _manifest_checksum(manifest):
+    content = {key: value for key, value in manifest.items() if key != "checksum"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+def save_snapshot(snapshot, directory):
+    # Écrit dans un répertoire temporaire puis le renomme : un lecteur ne voit jamais d'instantané à moitié écrit
+    tmp_directory = f"{directory}.tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    columns = {}
+    for name, array in _arrays(snapshot).items():
+        filename = f"{name}.npy"
+        path = os.path.join(tmp_directory, filename)
+        np.save(path, np.ascontiguousarray(array))
+        columns[name] = {
+            "file": filename,
+            "dtype": str(array.dtype),
+            "shape": list(array.shape),
+            "size": os.path.getsize(path),
+            "sha256": _file_sha256(path),
+        }
+
+    manifest = {
+        "format": FORMAT,
+        "schema_version": SCHEMA_VERSION,
+        "version": snapshot.version,
+        "artist_count": len(snapshot.store),
+        "columns": columns,
+        "tables": {table: getattr(snapshot.store, table) for table in TABLES},
+        # Listes de paires plutôt que des objets JSON : les clés (pays, genres) ne sont pas toujours des chaînes
+        "country_popularity": list(snapshot.country_popularity.items()),
+        "genre_popularity_by_country": [
+            [country, list(genres.items())] for country, genres in snapshot.genre_popularity_by_country.items()
+        ],
+    }
+    manifest["checksum"] = _manifest_checksum(manifest)
+    with open(os.path.join(tmp_directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)  # Échappements \uXXXX : un demi-caractère isolé reste valide
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Manifeste illisible dans {directory} : {e}")
+    if manifest.get("format") != FORMAT:
+        raise SnapshotError(f"{directory} ne contient pas un instantané d'artistes")
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        raise SnapshotError(f"Version de schéma {manifest.get('schema_version')} non prise en charge (attendue : {SCHEMA_VERSION})")
+    if manifest.get("checksum") != _manifest_checksum(manifest):
+        raise SnapshotError("Le manifeste de l'instantané est corrompu")
+    return manifest
+
+def load_snapshot(directory, verify=True):
+    # verify=True recalcule l'empreinte SHA-256 de chaque colonne (lecture complète des fichiers) ;
+    # verify=False se contente de vérifier la taille, le type et la forme (démarrage quasi instantané).
+    manifest = read_manifest(directory)
+    expected = set(ARRAY_COLUMNS) | set(INDEX_COLUMNS) | {f"{name}.{part}" for name in STRING_COLUMNS for part in ("data", "offsets")}
+    if set(manifest["columns"]) != expected:
+        raise SnapshotError("Colonnes de l'instantané inattendues")
+    arrays = {}
+    for name, column in manifest["columns"].items():
+        path = os.path.join(directory, column["file"])
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise SnapshotError(f"Colonne manquante : {column['file']}")
+        if size != column["size"]:
+            raise SnapshotError(f"Taille inattendue pour {column['file']}")
+        if verify and _file_sha256(path) != column["sha256"]:
+            raise SnapshotError(f"Empreinte SHA-256 invalide pour {column['file']}")
+        try:
+            array = np.load(path, mmap_mode="r")
+        except ValueError as e:
+            raise SnapshotError(f"Colonne illisible {column['file']} : {e}")
+        if str(array.dtype) != column["dtype"] or list(array.shape) != column["shape"]:
+            raise SnapshotError(f"Type ou forme inattendus pour {column['file']}")
+        arrays[name] = array
+
+    columns = {name: arrays[name] for name in ARRAY_COLUMNS}
+    for name in STRING_COLUMNS:
+        columns[name] = StringColumn(arrays[f"{name}.data"], arrays[f"{name}.offsets"])
+    tables = {table: list(values) for table, values in manifest["tables"].items()}
+    store = ArtistStore(**columns, **tables)
+    if len(store) != manifest["artist_count"]:
+        raise SnapshotError("Nombre d'artistes incohérent")
+
+    index = ArtistIndex(
+        store,
+        StringColumn(arrays["index.sorted_names.data"], arrays["index.sorted_names.offsets"]),
+        **{name: arrays[f"index.{name}"] for name in INDEX_ARRAYS},
+    )
+
+    country_popularity = {country: data for country, data in manifest["country_popularity"]}
+    genre_popularity_by_country = {country: dict(genres) for country, genres in manifest["genre_popularity_by_country"]}
+    return Snapshot(store, country_popularity, genre_popularity_by_country, manifest["version"], index=index)
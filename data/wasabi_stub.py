@@ -0,0 +1,166 @@
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Serveur HTTP local qui imite l'endpoint WASABI /api/v1/artist_all/<page>.
+# Il sert des artistes générés (ou fournis) et permet de travailler sans Internet.
+
+COUNTRIES = ["France", "United States", "United Kingdom", "Germany", "Canada", "Japan", "Brazil", "Sweden", "Italy", "Spain"]
+CITIES = ["Paris", "Lyon", "New York", "London", "Berlin", "Montreal", "Tokyo", "Rio de Janeiro", "Stockholm", "Rome", "Madrid"]
+GENRES = ["Rock", "Pop", "Rap", "Jazz", "Electro", "Metal", "Folk", "Reggae", "Blues", "Soul", "Punk", "Classical"]
+
+def generate_artist(rng, index, albums_per_artist=3, songs_per_album=10):
+    albums = []
+    for album_index in range(albums_per_artist):
+        albums.append({
+            "title": f"Album {index}-{album_index}",
+            "songs": [
+                {"title": f"Song {index}-{album_index}-{song_index}", "lyrics": "la " * 20}
+                for song_index in range(songs_per_album)
+            ],
+        })
+    return {
+        "_id": f"artist-{index}",
+        "name": f"Artist {index}",
+        "location": {"city": rng.choice(CITIES), "country": rng.choice(COUNTRIES)},
+        "deezerFans": rng.randint(0, 5_000_000),
+        "genres": rng.sample(GENRES, rng.randint(0, 3)),
+        "albums": albums,
+    }
+
+def generate_pages(page_count, artists_per_page=200, albums_per_artist=3, songs_per_album=10, seed=0):
+    # Renvoie un dictionnaire {numéro de page: liste d'artistes}, les pages commençant à 1
+    rng = random.Random(seed)
+    pages = {}
+    for page in range(1, page_count + 1):
+        first = (page - 1) * artists_per_page
+        pages[page] = [
+            generate_artist(rng, first + i, albums_per_artist, songs_per_album)
+            for i in range(artists_per_page)
+        ]
+    return pages
+
+class WasabiStub:
+    PAGE_PATH = re.compile(r"^/api/v1/artist_all/(\d+)$")
+
+    def __init__(self, pages=None, host="127.0.0.1", port=0, delay=0.0):
+        self.pages = pages if pages is not None else generate_pages(3)
+        self.delay = delay  # Latence simulée (en secondes) pour chaque réponse
+        self.failures = {}  # {page: [codes HTTP à renvoyer avant de répondre normalement]}
+        self.requests = []  # Journal des pages demandées
+        self.active = 0  # Nombre de requêtes en cours de traitement
+        self.max_active = 0  # Nombre maximal de requêtes traitées simultanément
+        self.bytes_sent = 0  # Octets de corps envoyés (hors en-têtes)
+        self.last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+        self._lock = threading.Lock()
+        self._encoded = {}  # Cache des corps JSON déjà sérialisés
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/artist_all/"
+
+    def body(self, page):
+        if page not in self._encoded:
+            self._encoded[page] = json.dumps(self.pages.get(page, [])).encode("utf-8")
+        return self._encoded[page]
+
+    def etag(self, page):
+        return '"%s"' % hashlib.sha256(self.body(page)).hexdigest()[:16]
+
+    def set_page(self, page, artists):
+        # Remplace le contenu d'une page (son ETag change en conséquence)
+        self.pages[page] = artists
+        self._encoded.pop(page, None)
+
+    def set_body(self, page, body):
+        # Remplace le corps brut d'une page, pour simuler une réponse invalide (HTML, JSON tronqué)
+        self._encoded[page] = body
+
+    def _next_failure(self, page):
+        with self._lock:
+            self.requests.append(page)
+            codes = self.failures.get(page)
+            if codes:
+                return codes.pop(0)
+        return None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                match = WasabiStub.PAGE_PATH.match(self.path)
+                if not match:
+                    self._send(404, b"{}")
+                    return
+                page = int(match.group(1))
+                with stub._lock:
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    failure = stub._next_failure(page)
+                    if failure:
+                        self._send(failure, b"{}")
+                    elif self.headers.get("If-None-Match") == stub.etag(page):
+                        self._send(304, b"", page)
+                    else:
+                        self._send(200, stub.body(page), page)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _send(self, status, body, page=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if page is not None:
+                    self.send_header("ETag", stub.etag(page))
+                    self.send_header("Last-Modified", stub.last_modified)
+                if status in (429, 503):
+                    self.send_header("Retry-After", "0")
+                if status != 304:
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    stub.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    # Utilisation : python wasabi_stub.py [nombre de pages] [port]
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    stub = WasabiStub(generate_pages(page_count), port=port)
+    print(f"Serveur WASABI local sur {stub.base_url}")
+    stub._server.serve_forever()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules de data/ s'importent entre eux par leur nom (ex : "from api_client import APIClient")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
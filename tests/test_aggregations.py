@@ -0,0 +1,86 @@
+import unittest
+
+import aggregations
+from artist_index import ArtistIndex
+from artist_store import ArtistStore, ArtistStoreBuilder
+from reference import legacy_aggregates, random_artists
+
+def build(artists):
+    builder = ArtistStoreBuilder()
+    for artist in artists:
+        builder.append(*artist)
+    return builder.build()
+
+class TestAggregations(unittest.TestCase):
+    def setUp(self):
+        self.artists = random_artists(500, max_fans=10**9)
+        self.store = build(self.artists)
+
+    def test_matches_legacy_dicts_including_key_order(self):
+        country_popularity, genre_popularity_by_country = legacy_aggregates(self.artists)
+        result = aggregations.country_popularity(self.store)
+        self.assertEqual(result, country_popularity)
+        self.assertEqual(list(result), list(country_popularity))
+
+        result = aggregations.genre_popularity_by_country(self.store)
+        self.assertEqual(result, genre_popularity_by_country)
+        self.assertEqual(list(result), list(genre_popularity_by_country))
+        for country, genres in result.items():
+            self.assertEqual(list(genres), list(genre_popularity_by_country[country]))
+
+    def test_empty_store(self):
+        store = ArtistStore.empty()
+        self.assertEqual(aggregations.country_popularity(store), {})
+        self.assertEqual(aggregations.genre_popularity_by_country(store), {})
+        self.assertEqual(aggregations.top_artists_by_genre(store), {})
+        self.assertEqual(aggregations.top_artists(store), [])
+
+    def test_country_without_genres(self):
+        store = build([("A", "Paris", "France", 5, [], {})])
+        self.assertEqual(aggregations.genre_popularity_by_country(store), {"France": {}})
+
+    def test_top_artists_by_country_and_genre(self):
+        top = aggregations.top_artists_by_country(self.store, n=3)
+        for country in aggregations.country_popularity(self.store):
+            expected = sorted((i for i, a in enumerate(self.artists) if a[2] == country), key=lambda i: (-self.artists[i][3], i))[:3]
+            self.assertEqual([artist["id"] for artist in top[country]], expected)
+
+        top = aggregations.top_artists_by_genre(self.store, n=5)
+        rock = sorted({i for i, a in enumerate(self.artists) if "Rock" in a[4]}, key=lambda i: (-self.artists[i][3], i))
+        self.assertEqual([artist["id"] for artist in top["Rock"]], rock[:5])
+
+    def test_top_artists_by_genre_ignores_repeated_genres(self):
+        store = build([
+            ("A", "Paris", "France", 10, ["Rock", "Rock"], {}),
+            ("B", "Lyon", "France", 5, ["Rock"], {}),
+        ])
+        top = aggregations.top_artists_by_genre(store, n=2)
+        self.assertEqual([artist["name"] for artist in top["Rock"]], ["A", "B"])
+        index = ArtistIndex.build(store)
+        self.assertEqual([artist["name"] for artist in top["Rock"]],
+                         [store.name(i) for i in index.by_country_genre(genre="Rock").tolist()])
+
+    def test_top_artists_with_filters(self):
+        result = aggregations.top_artists(self.store, n=4, country="Japan", genre="Jazz")
+        expected = sorted((i for i, a in enumerate(self.artists) if a[2] == "Japan" and "Jazz" in a[4]), key=lambda i: (-self.artists[i][3], i))[:4]
+        self.assertEqual([artist["id"] for artist in result], expected)
+        self.assertEqual(aggregations.top_artists(self.store, country="Atlantis"), [])
+
+    def test_fan_histogram(self):
+        histogram = aggregations.fan_histogram(self.store, bins=[0, 100, 10**6])
+        fans = [a[3] for a in self.artists]
+        self.assertEqual(histogram["counts"], [
+            sum(f < 100 for f in fans),
+            sum(100 <= f < 10**6 for f in fans),
+            sum(f >= 10**6 for f in fans),
+        ])
+        self.assertEqual(sum(aggregations.fan_histogram(self.store, country="France")["counts"]),
+                         aggregations.country_popularity(self.store)["France"]["artist_count"])
+
+    def test_genre_share_by_country(self):
+        for country, shares in aggregations.genre_share_by_country(self.store).items():
+            if shares and any(shares.values()):
+                self.assertAlmostEqual(sum(shares.values()), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,58 @@
 import unittest
-from data.api_client import APIClient
+from api_client import APIClient
+from data_loader import DataLoader
+from wasabi_stub import WasabiStub, generate_pages
 
 class TestAPIClient(unittest.TestCase):
+    # Hors ligne : le serveur WASABI local remplace l'API réelle
     def test_get_artist_data_from_api(self):
-        client = APIClient()
-        result = client.get_artist_data_by_country('all')  # Vérifier que tous les pays renvoient des données
+        with WasabiStub(generate_pages(2, artists_per_page=50, albums_per_artist=1, songs_per_album=1)) as stub:
+            client = APIClient(base_url=stub.base_url, backoff_factor=0)
+            loader = DataLoader(api_client=client)
+            loader.load_artists()
+            client.close()
+        result = loader.get_country_popularity()  # Vérifier que tous les pays renvoient des données
         self.assertIsNotNone(result)
         self.assertIn('France', result)  # Vérifier qu'il y a des données pour la France
-        self.assertIn('artistsCount', result['France'])  # Vérifier la présence des données d'artistes
+        self.assertIn('artist_count', result['France'])  # Vérifier la présence des données d'artistes
+        self.assertEqual(sum(data['artist_count'] for data in result.values()), 100)
+
+class TestConcurrentFetch(unittest.TestCase):
+    def setUp(self):
+        self.stub = WasabiStub(generate_pages(6, artists_per_page=5, albums_per_artist=1, songs_per_album=2), delay=0.05).start()
+        self.client = APIClient(base_url=self.stub.base_url, timeout=5, backoff_factor=0, max_workers=3)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def test_fetch_pages_returns_pages_in_order(self):
+        results = list(self.client.fetch_pages(range(1, 7)))
+        self.assertEqual([page for page, _ in results], [1, 2, 3, 4, 5, 6])
+        for page, artists in results:
+            self.assertEqual(artists, self.stub.pages[page])
+
+    def test_fetch_pages_respects_concurrency_limit(self):
+        list(self.client.fetch_pages(range(1, 7)))
+        self.assertGreater(self.stub.max_active, 1)
+        self.assertLessEqual(self.stub.max_active, 3)
+
+    def test_retries_on_429_and_5xx(self):
+        self.stub.failures[2] = [429, 503, 500]
+        self.assertEqual(self.client.fetch_artists(2), self.stub.pages[2])
+        self.assertEqual(self.stub.requests.count(2), 4)
+
+    def test_gives_up_after_max_retries(self):
+        self.stub.failures[1] = [502] * 10
+        self.assertEqual(self.client.fetch_artists(1), [])
+        self.assertEqual(self.stub.requests.count(1), 4)
+
+    def test_data_loader_aggregates_are_deterministic(self):
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists(max_pages=6)
+        expected = [artist["name"] for page in range(1, 7) for artist in self.stub.pages[page]]
+        self.assertEqual([artist["name"] for artist in loader.get_artist_data()], expected)
+        self.assertEqual(loader.get_total_artists(), 30)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from artist_index import ArtistIndex
+from artist_store import ArtistStore, ArtistStoreBuilder
+from reference import random_artists
+
+class TestArtistIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.artists = random_artists(400, seed=1)
+        builder = ArtistStoreBuilder()
+        for artist in cls.artists:
+            builder.append(*artist)
+        cls.index = ArtistIndex.build(builder.build())
+
+    def linear_scan(self, prefix=None, country=None, genre=None, min_fans=None, max_fans=None, order="fans"):
+        ids = [
+            i for i, (name, _, artist_country, fans, genres, _) in enumerate(self.artists)
+            if (prefix is None or name.casefold().startswith(prefix.casefold()))
+            and (country is None or artist_country == country)
+            and (genre is None or genre in genres)
+            and (min_fans is None or fans >= min_fans)
+            and (max_fans is None or fans <= max_fans)
+        ]
+        if order == "fans":
+            return sorted(ids, key=lambda i: (-self.artists[i][3], i))
+        return sorted(ids, key=lambda i: self.artists[i][0].casefold())
+
+    def assert_search(self, **criteria):
+        result = self.index.search(limit=None, **criteria)
+        expected = self.linear_scan(**criteria)
+        self.assertEqual([artist["id"] for artist in result["results"]], expected, criteria)
+        self.assertEqual(result["total"], len(expected))
+
+    def test_matches_linear_scan(self):
+        for criteria in (
+            {},
+            {"country": "France"},
+            {"genre": "Jazz"},
+            {"country": "Japan", "genre": "Rock"},
+            {"prefix": "ed"},
+            {"prefix": "É"},
+            {"prefix": "abb", "order": "name"},
+            {"min_fans": 500, "max_fans": 500},
+            {"min_fans": 9000},
+            {"max_fans": 0, "country": "Brazil"},
+            {"prefix": "d", "country": "France", "genre": "Pop", "min_fans": 100},
+            {"prefix": "z", "min_fans": 0, "order": "name"},
+        ):
+            self.assert_search(**criteria)
+
+    def test_unknown_values(self):
+        self.assertEqual(self.index.search(country="Atlantis")["total"], 0)
+        self.assertEqual(self.index.search(country="France", genre="Zydeco")["total"], 0)
+        self.assertEqual(self.index.search(prefix="qqq")["total"], 0)
+        self.assertEqual(self.index.search(min_fans=10**9)["total"], 0)
+
+    def test_pagination(self):
+        everything = self.index.search(genre="Rock", limit=None)["results"]
+        pages = [self.index.search(genre="Rock", offset=offset, limit=25) for offset in range(0, len(everything) + 25, 25)]
+        self.assertEqual([artist for page in pages for artist in page["results"]], everything)
+        self.assertEqual(pages[0]["limit"], 25)
+        self.assertTrue(all(page["total"] == len(everything) for page in pages))
+
+    def test_by_country_genre_without_criteria(self):
+        self.assertEqual(self.index.by_country_genre().tolist(), self.index.by_fans().tolist())
+
+    def test_invalid_order(self):
+        with self.assertRaises(ValueError):
+            self.index.search(order="popularity")
+
+    def test_empty_store(self):
+        index = ArtistIndex.build(ArtistStore.empty())
+        self.assertEqual(index.search(prefix="a", country="France", min_fans=1)["results"], [])
+
+if __name__ == '__main__':
+    unittest.main()
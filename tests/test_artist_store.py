@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from artist_store import ArtistRecords, ArtistStore, ArtistStoreBuilder
+
+ARTISTS = [
+    ("Édith Piaf", "Paris", "France", 1_200_000, ["Chanson", "Jazz"], {"La Vie en rose": ["La Vie en rose", "Hymne à l'amour"]}),
+    ("Nirvana", "Aberdeen", "United States", 9_000_000_000, ["Rock", "Grunge", "Rock"], {"Nevermind": ["Lithium"], "Bleach": []}),
+    ("Inconnu", "Inconnu", "Inconnu", 0, [], {}),
+    ("Daft Punk", "Paris", "France", 4_000_000, ["Electro"], {"Discovery": ["One More Time", "Aerodynamic"]}),
+]
+
+def expected_record(name, city, country, fans, genres, albums):
+    return {"name": name, "location": f"{city}, {country}", "deezer_fans": fans, "genres": genres, "albums": albums}
+
+class TestArtistStore(unittest.TestCase):
+    def build(self, artists):
+        builder = ArtistStoreBuilder()
+        for artist in artists:
+            builder.append(*artist)
+        return builder.build()
+
+    def test_records_match_original_dicts(self):
+        records = ArtistRecords(self.build(ARTISTS))
+        self.assertEqual(list(records), [expected_record(*artist) for artist in ARTISTS])
+        self.assertEqual(records[-1]["name"], "Daft Punk")
+        self.assertEqual(records[1:3], [expected_record(*artist) for artist in ARTISTS[1:3]])
+        with self.assertRaises(IndexError):
+            records[len(ARTISTS)]
+
+    def test_columns_are_interned_and_typed(self):
+        store = self.build(ARTISTS)
+        self.assertEqual(store.countries, ["France", "United States", "Inconnu"])
+        self.assertEqual(store.country_codes.tolist(), [0, 1, 2, 0])
+        self.assertEqual(store.genres, ["Chanson", "Jazz", "Rock", "Grunge", "Electro"])
+        self.assertEqual(store.genre_offsets.tolist(), [0, 2, 5, 5, 6])
+        self.assertEqual(store.fans.dtype, np.int64)
+        self.assertEqual(store.song_offsets.tolist(), [0, 2, 3, 3, 5])
+
+    def test_builder_extends_an_existing_store(self):
+        store = self.build(ARTISTS[:2])
+        builder = ArtistStoreBuilder(store)
+        for artist in ARTISTS[2:]:
+            builder.append(*artist)
+        extended = builder.build()
+        self.assertEqual(list(ArtistRecords(extended)), [expected_record(*artist) for artist in ARTISTS])
+        self.assertEqual(extended.countries, ["France", "United States", "Inconnu"])
+
+    def test_lone_surrogates_are_kept(self):
+        # "\ud83d" est un échappement JSON valide, mais pas encodable en UTF-8 strict
+        artist = ("Moitié \ud83d", "Paris", "France", 1, [], {"Album \udc00": ["Chanson \ud83d"]})
+        store = self.build([artist])
+        self.assertEqual(store.record(0), expected_record(*artist))
+
+    def test_rollback_removes_everything_after_mark(self):
+        builder = ArtistStoreBuilder()
+        builder.append(*ARTISTS[0])
+        mark = builder.mark()
+        builder.append(*ARTISTS[1])
+        with self.assertRaises(TypeError):
+            builder.append("Invalide", "Nulle part", "Atlantis", None, ["Zydeco"], {"Album": ["Chanson"]})
+        builder.rollback(mark)
+        builder.append(*ARTISTS[3])
+        store = builder.build()
+        self.assertEqual(list(ArtistRecords(store)), [expected_record(*ARTISTS[0]), expected_record(*ARTISTS[3])])
+        self.assertEqual(store.countries, ["France"])
+        self.assertEqual(store.cities, ["Paris"])
+        self.assertEqual(store.genres, ["Chanson", "Jazz", "Electro"])
+
+    def test_empty_store(self):
+        store = ArtistStore.empty()
+        self.assertEqual(len(store), 0)
+        self.assertEqual(list(ArtistRecords(store)), [])
+
+if __name__ == '__main__':
+    unittest.main()
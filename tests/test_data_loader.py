@@ -0,0 +1,141 @@
+import copy
+import json
+import socket
+import unittest
+
+from api_client import APIClient
+from data_loader import DataLoader
+from metrics import Metrics
+from reference import legacy_aggregates
+from wasabi_stub import WasabiStub, generate_pages
+
+class TestStreamingLoad(unittest.TestCase):
+    def setUp(self):
+        self.pages = generate_pages(5, artists_per_page=20, albums_per_artist=2, songs_per_album=3)
+        self.stub = WasabiStub(self.pages).start()
+        self.client = APIClient(base_url=self.stub.base_url, backoff_factor=0, max_workers=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def test_full_catalogue_stops_at_first_empty_page(self):
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists()
+        self.assertEqual(loader.get_total_artists(), 100)
+        self.assertIn(6, self.stub.requests)
+        self.assertLessEqual(max(self.stub.requests), 6 + self.client.max_workers)
+
+    def test_aggregates_match_legacy_computation(self):
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists()
+        artists = [(artist["name"], None, artist["location"]["country"], artist["deezerFans"], artist["genres"], None)
+                   for page in sorted(self.pages) for artist in self.pages[page]]
+        country_popularity, genre_popularity_by_country = legacy_aggregates(artists)
+        self.assertEqual(loader.get_country_popularity(), country_popularity)
+        self.assertEqual(loader.get_genre_popularity_by_country(), genre_popularity_by_country)
+
+    def test_artist_projection(self):
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists(max_pages=1)
+        source = self.pages[1][0]
+        artist = loader.get_artist_data()[0]
+        self.assertEqual(artist["name"], source["name"])
+        self.assertEqual(artist["location"], f"{source['location']['city']}, {source['location']['country']}")
+        self.assertEqual(artist["deezer_fans"], source["deezerFans"])
+        self.assertEqual(artist["genres"], source["genres"])
+        self.assertEqual(artist["albums"], {
+            album["title"]: [song["title"] for song in album["songs"]] for album in source["albums"]
+        })
+
+    def test_page_errors_are_skipped(self):
+        self.stub.failures[2] = [404]
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists(max_pages=5)
+        self.assertEqual(loader.get_total_artists(), 80)
+
+    def test_invalid_page_is_skipped_entirely(self):
+        # Page d'erreur HTML, puis corps tronqué au milieu d'un artiste
+        self.stub.set_body(2, b"<html>502 Bad Gateway</html>")
+        self.stub.set_body(4, json.dumps(self.pages[4]).encode("utf-8")[:-200])
+        metrics = Metrics()
+        loader = DataLoader(api_client=self.client, metrics=metrics)
+        loader.load_artists(max_pages=5)
+        self.assertEqual([artist["name"] for artist in loader.get_artist_data()],
+                         [artist["name"] for page in (1, 3, 5) for artist in self.pages[page]])
+        self.assertEqual(metrics.get("wasabi_pages_total", source="error"), 2)
+
+    def test_lone_surrogate_and_float_fans_are_accepted(self):
+        artists = copy.deepcopy(self.pages[2])
+        artists[0]["name"] = "Moitié \ud83d"
+        artists[0]["albums"][0]["songs"][0]["title"] = "Chanson \udc00"
+        artists[1]["deezerFans"] = 3.0
+        self.stub.set_body(2, json.dumps(artists).encode("utf-8"))  # Échappements \ud83d dans le JSON
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists(max_pages=3)
+        self.assertEqual(loader.get_total_artists(), 60)
+        records = loader.get_artist_data()
+        self.assertEqual(records[20]["name"], "Moitié \ud83d")
+        self.assertIn("Chanson \udc00", list(records[20]["albums"].values())[0])
+        self.assertEqual(records[21]["deezer_fans"], 3)
+        self.assertEqual(loader.search_artists(prefix="moitié")["total"], 1)
+
+    def test_page_with_an_invalid_artist_is_skipped_entirely(self):
+        artists = copy.deepcopy(self.pages[2])
+        artists[5]["genres"] = [["Rock"]]  # Genre non hachable : l'ajout au stockage échoue
+        artists[6]["location"]["country"] = "Atlantis"
+        self.stub.set_page(2, artists)
+        metrics = Metrics()
+        loader = DataLoader(api_client=self.client, metrics=metrics)
+        loader.load_artists(max_pages=3)
+        self.assertEqual([artist["name"] for artist in loader.get_artist_data()],
+                         [artist["name"] for page in (1, 3) for artist in self.pages[page]])
+        self.assertNotIn("Atlantis", loader.get_country_popularity())
+        self.assertNotIn("Atlantis", loader.artist_store.countries)
+        self.assertEqual(metrics.get("wasabi_pages_total", source="error"), 1)
+
+    def test_max_pages_zero_loads_nothing(self):
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists(max_pages=0)
+        self.assertEqual(loader.get_total_artists(), 0)
+        self.assertEqual(self.stub.requests, [])
+
+    def test_isolated_page_error_does_not_end_catalogue(self):
+        self.stub.failures[2] = [404]
+        loader = DataLoader(api_client=self.client)
+        self.assertEqual(loader.load_artists(), [2])
+        self.assertEqual(loader.get_total_artists(), 80)
+
+    def test_complete_load_reports_no_failed_page(self):
+        loader = DataLoader(api_client=self.client)
+        self.assertEqual(loader.load_artists(max_pages=3), [])
+
+    def test_catalogue_ending_with_errors(self):
+        # Pages hors catalogue en 404 au lieu d'une liste vide
+        for page in range(6, 30):
+            self.stub.failures[page] = [404]
+        loader = DataLoader(api_client=self.client)
+        loader.load_artists()
+        self.assertEqual(loader.get_total_artists(), 100)
+        self.assertLessEqual(max(self.stub.requests), 5 + DataLoader.MAX_CONSECUTIVE_FAILURES + self.client.max_workers)
+
+class TestUnreachableServer(unittest.TestCase):
+    def test_full_catalogue_load_returns(self):
+        # Port fermé : toutes les connexions sont refusées
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        metrics = Metrics()
+        client = APIClient(base_url=f"http://127.0.0.1:{port}/api/v1/artist_all/", timeout=1,
+                           backoff_factor=0, max_workers=2, metrics=metrics)
+        loader = DataLoader(api_client=client)
+        failed_pages = loader.load_artists()
+        client.close()
+        self.assertEqual(loader.get_total_artists(), 0)
+        self.assertEqual(failed_pages, sorted(failed_pages))
+        self.assertGreaterEqual(len(failed_pages), DataLoader.MAX_CONSECUTIVE_FAILURES)
+        self.assertLessEqual(metrics.get("wasabi_pages_total", source="error"),
+                             DataLoader.MAX_CONSECUTIVE_FAILURES + client.max_workers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+
+from api_client import APIClient
+from data_loader import DataLoader
+from http_cache import ResponseCache
+from wasabi_stub import WasabiStub, generate_pages
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.stub = WasabiStub(generate_pages(3, artists_per_page=4, albums_per_artist=1, songs_per_album=2)).start()
+
+    def tearDown(self):
+        self.stub.stop()
+        self.tmp.cleanup()
+
+    def make_client(self, **cache_options):
+        cache_options.setdefault("ttl", 60)
+        cache = ResponseCache(self.tmp.name, clock=self.clock, **cache_options)
+        return APIClient(base_url=self.stub.base_url, backoff_factor=0, cache=cache)
+
+    def test_warm_restart_sends_no_bytes(self):
+        client = self.make_client()
+        first = [artists for _, artists in client.fetch_pages(range(1, 4))]
+        client.close()
+        sent = self.stub.bytes_sent
+
+        # Nouveau client (nouveau processus) sur le même répertoire de cache
+        client = self.make_client()
+        second = [artists for _, artists in client.fetch_pages(range(1, 4))]
+        self.assertEqual(first, second)
+        self.assertEqual(self.stub.bytes_sent, sent)
+        self.assertEqual(len(self.stub.requests), 3)
+        stats = client.cache.stats()
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["misses"], 0)
+        self.assertEqual(stats["bytes_from_network"], 0)
+
+    def test_expired_entry_is_revalidated(self):
+        client = self.make_client()
+        client.fetch_artists(1)
+        sent = self.stub.bytes_sent
+        self.clock.now += 120
+
+        self.assertEqual(client.fetch_artists(1), self.stub.pages[1])
+        self.assertEqual(self.stub.bytes_sent, sent)  # Réponse 304 sans corps
+        self.assertEqual(client.cache.stats()["revalidations"], 1)
+
+        # L'entrée revalidée est de nouveau fraîche
+        client.fetch_artists(1)
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_expired_entry_is_replaced_when_page_changed(self):
+        client = self.make_client()
+        client.fetch_artists(1)
+        self.stub.set_page(1, self.stub.pages[2])
+        self.clock.now += 120
+        self.assertEqual(client.fetch_artists(1), self.stub.pages[2])
+        self.assertEqual(client.fetch_artists(1), self.stub.pages[2])
+        self.assertEqual(len(self.stub.requests), 2)
+        stats = client.cache.stats()
+        self.assertEqual(stats["misses"], 2)  # Première requête, puis entrée expirée retéléchargée
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["revalidations"], 0)
+
+    def test_invalid_body_is_not_kept(self):
+        # Réponse 200 invalide et passagère : elle ne doit pas être resservie pendant tout le ttl
+        client = self.make_client()
+        self.stub.set_body(2, b"<html>Erreur</html>")
+        self.assertEqual(client.fetch_artists(2), [])
+        loader = DataLoader(api_client=client)
+        loader.load_artists(max_pages=3)
+        self.assertEqual(loader.get_total_artists(), 8)
+
+        self.stub.set_page(2, self.stub.pages[2])
+        self.assertEqual(client.fetch_artists(2), self.stub.pages[2])
+        loader = DataLoader(api_client=client)
+        loader.load_artists(max_pages=3)
+        self.assertEqual(loader.get_total_artists(), 12)
+        self.assertEqual(self.stub.requests.count(2), 3)
+
+    def test_lru_eviction_bounded_by_bytes(self):
+        page_size = len(self.stub.body(1))
+        client = self.make_client(max_bytes=int(page_size * 2.5))
+        client.fetch_artists(1)
+        client.fetch_artists(2)
+        client.fetch_artists(1)  # La page 1 devient la plus récemment utilisée
+        client.fetch_artists(3)  # Évince la page 2
+
+        stats = client.cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["size_bytes"], page_size * 2.5)
+        self.assertIsNone(client.cache.get(client.page_url(2)))
+        self.assertIsNotNone(client.cache.get(client.page_url(1)))
+
+if __name__ == '__main__':
+    unittest.main()
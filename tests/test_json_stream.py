@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from json_stream import iter_chunks, iter_json_array
+
+class TestIterJsonArray(unittest.TestCase):
+    def parse(self, document, chunk_size):
+        return list(iter_json_array(iter_chunks(document.encode("utf-8"), chunk_size)))
+
+    def test_matches_json_loads_for_any_chunk_size(self):
+        items = [{"name": "Édith Piaf", "albums": [{"title": "L'Hymne à l'amour", "songs": []}]}, 12, -3.5e2, "é", None, True, [1, [2]]]
+        document = json.dumps(items, ensure_ascii=False, indent=2)
+        for chunk_size in (1, 2, 3, 7, 64, 10_000):
+            self.assertEqual(self.parse(document, chunk_size), items)
+
+    def test_empty_array(self):
+        self.assertEqual(self.parse(" [ ] ", 1), [])
+
+    def test_yields_items_before_the_end_of_the_stream(self):
+        chunks = iter([b'[{"a": 1}, ', b'{"b": 2}'])
+        stream = iter_json_array(chunks)
+        self.assertEqual(next(stream), {"a": 1})
+        self.assertEqual(next(stream), {"b": 2})
+        with self.assertRaises(ValueError):
+            next(stream)  # Le tableau n'est jamais fermé
+
+    def test_rejects_non_array_documents(self):
+        with self.assertRaises(ValueError):
+            self.parse('{"a": 1}', 4)
+        with self.assertRaises(ValueError):
+            self.parse('[1 2]', 4)
+
+if __name__ == '__main__':
+    unittest.main()
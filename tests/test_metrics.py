@@ -0,0 +1,151 @@
+import json
+import logging
+import tempfile
+import threading
+import unittest
+
+import server
+from api_client import APIClient
+from data_loader import DataLoader
+from http_cache import ResponseCache
+from metrics import Metrics, current_rss
+from wasabi_stub import WasabiStub, generate_pages
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_counters_gauges_and_summaries(self):
+        self.metrics.inc("wasabi_pages_total", source="network")
+        self.metrics.inc("wasabi_pages_total", 2, source="network")
+        self.metrics.inc("wasabi_pages_total", source="cache")
+        self.metrics.set("dataloader_artists", 10)
+        self.metrics.set("dataloader_artists", 12)
+        self.metrics.observe("dataloader_parse_seconds", 0.5)
+        self.metrics.observe("dataloader_parse_seconds", 0.25)
+
+        self.assertEqual(self.metrics.get("wasabi_pages_total", source="network"), 3)
+        self.assertEqual(self.metrics.get("wasabi_pages_total", source="cache"), 1)
+        self.assertIsNone(self.metrics.get("wasabi_pages_total", source="error"))
+        self.assertEqual(self.metrics.get("dataloader_artists"), 12)
+        self.assertEqual(self.metrics.get("dataloader_parse_seconds"), (2, 0.75, 0.5))
+
+    def test_timed_iter_excludes_consumer_time(self):
+        def produce():
+            yield 1
+            yield 2
+
+        items = []
+        for item in self.metrics.timed_iter(produce(), "dataloader_parse_seconds"):
+            items.append(item)
+            sum(range(200_000))  # Travail de l'appelant, qui ne doit pas être compté
+        count, total, _ = self.metrics.get("dataloader_parse_seconds")
+        self.assertEqual(items, [1, 2])
+        self.assertEqual(count, 1)
+        self.assertLess(total, 0.001)
+
+    def test_prometheus_text_format(self):
+        self.metrics.inc("http_requests_total", route="/api/artists", status=200)
+        self.metrics.observe("http_request_seconds", 0.5, route='/a"b')
+        text = self.metrics.to_prometheus()
+        self.assertIn("# TYPE http_requests_total counter", text)
+        self.assertIn('http_requests_total{route="/api/artists",status="200"} 1', text)
+        self.assertIn("# TYPE http_request_seconds summary", text)
+        self.assertIn('http_request_seconds_count{route="/a\\"b"} 1', text)
+        self.assertIn('http_request_seconds_sum{route="/a\\"b"} 0.5', text)
+        self.assertIn('http_request_seconds_max{route="/a\\"b"} 0.5', text)
+        self.assertTrue(text.endswith("\n"))
+
+    @unittest.skipIf(current_rss() is None, "mémoire résidente non disponible sur ce système")
+    def test_rss_peak_is_sampled_during_the_operation(self):
+        size = 64 * 1024 * 1024
+        with self.metrics.sample_rss(interval=0.001) as sampler:
+            block = bytearray(size)  # Pages réellement touchées : comptées dans la mémoire résidente
+            threading.Event().wait(0.05)
+            del block
+        peak, increase = self.metrics.record_rss(sampler)
+        self.assertGreaterEqual(increase, size * 0.9)
+        self.assertEqual(self.metrics.get("dataloader_peak_rss_bytes"), peak)
+
+        # Une opération suivante, sans allocation, ne reprend pas le pic précédent
+        with self.metrics.sample_rss() as sampler:
+            pass
+        _, increase = self.metrics.record_rss(sampler)
+        self.assertLess(increase, size / 2)
+
+    def test_structured_log(self):
+        self.metrics.inc("wasabi_pages_total", source="network")
+        with self.assertLogs("wasabi.metrics", logging.INFO) as logs:
+            self.metrics.log("load_artists", artists=3)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["event"], "load_artists")
+        self.assertEqual(entry["artists"], 3)
+        self.assertEqual(entry["metrics"]['wasabi_pages_total{source="network"}'], 1)
+
+class TestLoadInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.stub = WasabiStub(generate_pages(3, artists_per_page=20, albums_per_artist=1, songs_per_album=1)).start()
+        self.metrics = Metrics()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.client = APIClient(base_url=self.stub.base_url, backoff_factor=0,
+                                cache=ResponseCache(self.cache_dir.name), metrics=self.metrics)
+        self.loader = DataLoader(api_client=self.client)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+        self.cache_dir.cleanup()
+
+    def test_load_artists_records_fetch_parse_and_aggregation(self):
+        self.loader.load_artists(max_pages=3)
+        self.assertIs(self.loader.metrics, self.metrics)
+        self.assertEqual(self.metrics.get("wasabi_pages_total", source="network"), 3)
+        self.assertEqual(self.metrics.get("wasabi_bytes_downloaded_total"), self.stub.bytes_sent)
+        self.assertEqual(self.metrics.get("wasabi_page_fetch_seconds")[0], 3)
+        self.assertEqual(self.metrics.get("dataloader_parse_seconds")[0], 3)
+        self.assertEqual(self.metrics.get("dataloader_aggregation_seconds")[0], 1)
+        self.assertEqual(self.metrics.get("dataloader_load_seconds", operation="load_artists")[0], 1)
+        self.assertEqual(self.metrics.get("dataloader_artists"), 60)
+        if current_rss() is not None:
+            peak = self.metrics.get("dataloader_peak_rss_bytes", operation="load_artists")
+            self.assertGreaterEqual(peak, self.metrics.get("dataloader_rss_increase_bytes", operation="load_artists"))
+            self.assertGreater(peak, 0)
+
+    def test_cache_hits_are_counted_separately(self):
+        self.loader.load_artists(max_pages=3)
+        self.loader.refresh(max_pages=3)
+        self.assertEqual(self.metrics.get("wasabi_pages_total", source="cache"), 3)
+        self.assertEqual(self.metrics.get("wasabi_page_fetch_seconds")[0], 3)  # Aucun nouvel appel réseau
+        self.assertEqual(self.metrics.get("dataloader_load_seconds", operation="refresh")[0], 1)
+
+    def test_errors_are_counted(self):
+        self.stub.failures[2] = [404]
+        self.loader.load_artists(max_pages=3)
+        self.assertEqual(self.metrics.get("wasabi_pages_total", source="error"), 1)
+        self.assertEqual(self.metrics.get("dataloader_artists"), 40)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_requests_are_counted_by_route(self):
+        metrics = Metrics()
+        with WasabiStub(generate_pages(1, artists_per_page=10, albums_per_artist=1, songs_per_album=1)) as stub:
+            client = APIClient(base_url=stub.base_url, backoff_factor=0, metrics=metrics)
+            loader = DataLoader(api_client=client)
+            loader.load_artists(max_pages=1)
+            client.close()
+        app = server.create_app(loader)
+        test_client = app.test_client()
+        test_client.get("/api/countries/France/genres")
+        test_client.get("/api/countries/Atlantis/genres")
+
+        response = test_client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        text = response.get_data(as_text=True)
+        route = "/api/countries/<country>/genres"
+        self.assertIn(f'http_requests_total{{route="{route}",status="200"}} 1', text)
+        self.assertIn(f'http_requests_total{{route="{route}",status="404"}} 1', text)
+        self.assertIn('wasabi_pages_total{source="network"} 1', text)
+        self.assertIn("dataloader_artists 10", text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import copy
+import threading
+import unittest
+
+from api_client import APIClient
+from data_loader import DataLoader, RefreshError
+from snapshot import Snapshot
+from refresh import RefreshScheduler
+from wasabi_stub import WasabiStub, generate_pages
+
+class TestIncrementalRefresh(unittest.TestCase):
+    def setUp(self):
+        self.stub = WasabiStub(generate_pages(3, artists_per_page=30, albums_per_artist=1, songs_per_album=1)).start()
+        self.client = APIClient(base_url=self.stub.base_url, backoff_factor=0)
+        self.loader = DataLoader(api_client=self.client)
+        self.loader.load_artists()
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+
+    def edit_page(self, page, edit):
+        artists = copy.deepcopy(self.stub.pages[page])
+        edit(artists)
+        self.stub.set_page(page, artists)
+
+    def assert_matches_full_rebuild(self):
+        snapshot = self.loader.snapshot
+        expected = Snapshot.from_store(snapshot.store, snapshot.version)
+        self.assertEqual(snapshot.country_popularity, expected.country_popularity)
+        self.assertEqual(snapshot.genre_popularity_by_country, expected.genre_popularity_by_country)
+        self.assertEqual(snapshot.genre_occurrences(), expected.genre_occurrences())
+
+    def test_refresh_without_changes(self):
+        before = self.loader.snapshot
+        self.assertEqual(self.loader.refresh(), {"added": 0, "changed": 0, "removed": 0})
+        self.assertIs(self.loader.snapshot, before)  # Même version : index et réponses précalculées conservés
+
+    def test_refresh_with_unaggregated_changes(self):
+        # Un nouveau nom ne change aucun agrégat, mais doit tout de même être servi
+        self.edit_page(2, lambda artists: artists[0].update(name="Renamed"))
+        version = self.loader.version
+        self.assertEqual(self.loader.refresh(), {"added": 0, "changed": 0, "removed": 0})
+        self.assertEqual(self.loader.version, version + 1)
+        self.assertIn("Renamed", [artist["name"] for artist in self.loader.get_artist_data()])
+
+    def test_applies_added_changed_and_removed_artists(self):
+        def edit(artists):
+            artists[0]["deezerFans"] += 1000
+            artists[1]["location"]["country"] = "Atlantis"
+            artists[2]["genres"] = ["Zydeco", "Zydeco"]
+            del artists[3]
+            artists.append(dict(copy.deepcopy(artists[5]), _id="new-artist", name="New Artist"))
+
+        self.edit_page(2, edit)
+        self.stub.set_page(3, [])  # Toute la page 3 disparaît du catalogue
+        changes = self.loader.refresh()
+        self.assertEqual(changes, {"added": 1, "changed": 3, "removed": 31})
+        self.assertEqual(self.loader.get_total_artists(), 60)
+        self.assertEqual(self.loader.get_country_popularity()["Atlantis"]["artist_count"], 1)
+        self.assertEqual(self.loader.get_genre_popularity_by_country()[self.stub.pages[2][2]["location"]["country"]]["Zydeco"],
+                         2 * self.stub.pages[2][2]["deezerFans"])
+        self.assert_matches_full_rebuild()
+
+        # Le seul artiste d'Atlantis repart : le pays disparaît des agrégats
+        self.edit_page(2, lambda artists: artists[1]["location"].update(country="France"))
+        self.loader.refresh()
+        self.assertNotIn("Atlantis", self.loader.get_country_popularity())
+        self.assertNotIn("Atlantis", self.loader.get_genre_popularity_by_country())
+        self.assert_matches_full_rebuild()
+
+    def test_previous_snapshot_is_never_modified(self):
+        before = self.loader.snapshot
+        country_popularity = copy.deepcopy(before.country_popularity)
+        genre_popularity_by_country = copy.deepcopy(before.genre_popularity_by_country)
+        self.edit_page(1, lambda artists: artists[0].update(deezerFans=0, genres=[]))
+        self.loader.refresh()
+        self.assertIsNot(self.loader.snapshot, before)
+        self.assertEqual(before.country_popularity, country_popularity)
+        self.assertEqual(before.genre_popularity_by_country, genre_popularity_by_country)
+
+    def test_readers_always_see_consistent_snapshots(self):
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                snapshot = self.loader.snapshot
+                counted = sum(data["artist_count"] for data in snapshot.country_popularity.values())
+                if counted != snapshot.total_artists:
+                    errors.append((counted, snapshot.total_artists))
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for i in range(5):
+            self.edit_page(1, lambda artists: artists.pop() if i % 2 else artists.append(dict(artists[0], _id=f"extra-{i}")))
+            self.loader.refresh()
+        stop.set()
+        for thread in readers:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_failed_page_aborts_refresh(self):
+        # Erreur passagère (503 après toutes les tentatives) : aucun artiste ne doit disparaître
+        before = self.loader.snapshot
+        self.stub.failures[2] = [503] * 10
+        with self.assertRaises(RefreshError):
+            self.loader.refresh()
+        self.assertIs(self.loader.snapshot, before)
+
+        self.stub.set_body(3, b"<html>Erreur</html>")
+        with self.assertRaises(RefreshError):
+            self.loader.refresh()
+        self.assertIs(self.loader.snapshot, before)
+
+        # Une fois l'API rétablie, le rafraîchissement suivant s'applique normalement
+        self.stub.failures.clear()
+        self.stub.set_page(3, self.stub.pages[3])
+        self.assertEqual(self.loader.refresh(), {"added": 0, "changed": 0, "removed": 0})
+        self.assertEqual(self.loader.get_total_artists(), 90)
+
+    def test_scheduler_keeps_snapshot_when_refresh_fails(self):
+        before = self.loader.snapshot
+        self.stub.failures[1] = [503] * 10
+        scheduler = RefreshScheduler(self.loader)
+        self.assertIsNone(scheduler.refresh_once())
+        self.assertEqual(scheduler.refresh_count, 0)
+        self.assertIs(self.loader.snapshot, before)
+
+    def test_scheduler_calls_on_refresh_only_after_success(self):
+        calls = []
+        scheduler = RefreshScheduler(self.loader, on_refresh=calls.append)
+        self.stub.failures[1] = [503] * 10
+        scheduler.refresh_once()
+        self.assertEqual(calls, [])
+
+        self.stub.failures.clear()
+        scheduler.refresh_once()  # Aucun changement : rien à sauvegarder
+        self.assertEqual(calls, [])
+
+        self.edit_page(1, lambda artists: artists[0].update(deezerFans=42))
+        changes = scheduler.refresh_once()
+        self.assertEqual(calls, [changes])
+
+    def test_on_refresh_error_keeps_refresh(self):
+        def fail(changes):
+            raise OSError("disque plein")
+
+        self.edit_page(1, lambda artists: artists[0].update(deezerFans=42))
+        scheduler = RefreshScheduler(self.loader, on_refresh=fail)
+        self.assertEqual(scheduler.refresh_once()["changed"], 1)
+        self.assertEqual(scheduler.refresh_count, 1)
+
+    def test_scheduler_refreshes_in_background(self):
+        self.edit_page(1, lambda artists: artists[0].update(deezerFans=42))
+        scheduler = RefreshScheduler(self.loader, interval=3600).start()
+        try:
+            version = self.loader.version
+            scheduler.trigger()
+            for _ in range(200):
+                if scheduler.refresh_count:
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            scheduler.stop(timeout=5)
+        self.assertEqual(scheduler.refresh_count, 1)
+        self.assertEqual(scheduler.last_changes["changed"], 1)
+        self.assertEqual(self.loader.version, version + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import server
+from api_client import APIClient
+from data_loader import DataLoader
+from snapshot import Snapshot
+from wasabi_stub import WasabiStub, generate_pages
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with WasabiStub(generate_pages(3, artists_per_page=50, albums_per_artist=1, songs_per_album=1)) as stub:
+            client = APIClient(base_url=stub.base_url, backoff_factor=0)
+            cls.data_loader = DataLoader(api_client=client)
+            cls.data_loader.load_artists(max_pages=3)
+            client.close()
+
+    def setUp(self):
+        self.app = server.create_app(self.data_loader)
+        self.client = self.app.test_client()
+        self.responses = self.app.extensions["precomputed_responses"]
+
+    def get_json(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_country_map(self):
+        data = self.get_json("/api/artists")
+        expected = self.data_loader.get_country_popularity()
+        self.assertEqual({item["country"]: item["popularity"] for item in data},
+                         {country: value["total_popularity"] for country, value in expected.items()})
+        self.assertEqual(sum(item["artist_count"] for item in data), 150)
+
+    def test_country_genres_sorted_by_popularity(self):
+        data = self.get_json("/api/countries/France/genres")
+        expected = self.data_loader.get_genre_popularity_by_country()["France"]
+        self.assertEqual({item["genre"]: item["popularity"] for item in data}, expected)
+        popularity = [item["popularity"] for item in data]
+        self.assertEqual(popularity, sorted(popularity, reverse=True))
+
+    def test_genre_artists(self):
+        genre = next(iter(self.data_loader.get_genre_popularity_by_country()["France"]))
+        data = self.get_json(f"/api/countries/France/genres/{genre}/artists")
+        self.assertTrue(data)
+        for artist in data:
+            self.assertEqual(artist["country"], "France")
+            self.assertIn(genre, artist["genres"])
+        fans = [artist["deezer_fans"] for artist in data]
+        self.assertEqual(fans, sorted(fans, reverse=True))
+
+    def test_search(self):
+        data = self.get_json("/api/artists/search?country=France&min_fans=1000&limit=5&offset=2")
+        expected = self.data_loader.search_artists(country="France", min_fans=1000, limit=5, offset=2)
+        self.assertEqual(data, expected)
+        self.assertLessEqual(len(data["results"]), 5)
+        self.assertEqual(self.get_json("/api/artists/search?prefix=artist%201&order=name&limit=1000")["limit"], server.MAX_SEARCH_LIMIT)
+        self.assertEqual(self.client.get("/api/artists/search?order=random").status_code, 400)
+
+    def test_payload_with_lone_surrogate(self):
+        payload = server.Payload([{"name": "Moitié \ud83d"}])
+        self.assertEqual(json.loads(payload.identity), [{"name": "Moitié \ud83d"}])
+        self.assertEqual(json.loads(gzip.decompress(payload.bodies["gzip"])), [{"name": "Moitié \ud83d"}])
+
+    def test_unknown_resources(self):
+        self.assertEqual(self.client.get("/api/countries/Atlantis/genres").status_code, 404)
+        self.assertEqual(self.client.get("/api/countries/France/genres/Zydeco/artists").status_code, 404)
+
+    def test_gzip_and_etag_revalidation(self):
+        response = self.client.get("/api/artists", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(response.data)), self.get_json("/api/artists"))
+
+        etag = response.headers["ETag"]
+        repeat = self.client.get("/api/artists", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.data, b"")
+        self.assertEqual(repeat.headers["ETag"], etag)
+
+        # L'ETag de la version compressée ne vaut pas pour la version non compressée
+        plain = self.client.get("/api/artists", headers={"If-None-Match": etag})
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotEqual(plain.headers["ETag"], etag)
+
+    @unittest.skipIf(server.brotli is None, "brotli n'est pas installé")
+    def test_brotli_preferred(self):
+        response = self.client.get("/api/artists", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(json.loads(server.brotli.decompress(response.data)), self.get_json("/api/artists"))
+
+    def test_responses_serialized_once_per_version(self):
+        for _ in range(20):
+            self.client.get("/api/artists")
+            self.client.get("/api/countries/France/genres")
+        self.assertEqual(self.responses.serializations, 2)
+
+        etag = self.client.get("/api/artists").headers["ETag"]
+        # Nouvelle version des données, au contenu identique
+        current = self.data_loader.snapshot
+        self.data_loader.snapshot = Snapshot.from_store(current.store, current.version + 1)
+        response = self.client.get("/api/artists", headers={"If-None-Match": etag})
+        self.assertEqual(self.responses.serializations, 3)
+        self.assertEqual(response.status_code, 304)  # Contenu identique : même ETag
+
+    def test_load_repeat_map_loads(self):
+        # Charge simulée : plusieurs « navigateurs » rechargent la carte en parallèle
+        paths = ["/api/artists", "/api/countries/France/genres", "/api/countries/Japan/genres"]
+        errors = []
+
+        def browser():
+            client = self.app.test_client()
+            etags = {}
+            try:
+                for i in range(200):
+                    path = paths[i % len(paths)]
+                    headers = {"Accept-Encoding": "gzip"}
+                    if path in etags:
+                        headers["If-None-Match"] = etags[path]
+                    response = client.get(path, headers=headers)
+                    expected = 304 if path in etags else 200
+                    if response.status_code != expected:
+                        errors.append((path, response.status_code))
+                    etags[path] = response.headers["ETag"]
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=browser) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.responses.serializations, len(paths))
+
+class TestInitialLoad(unittest.TestCase):
+    def setUp(self):
+        self.stub = WasabiStub(generate_pages(3, artists_per_page=10, albums_per_artist=1, songs_per_album=1)).start()
+        self.client = APIClient(base_url=self.stub.base_url, backoff_factor=0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot_dir = os.path.join(self.directory.name, "snapshot")
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.stop()
+        self.directory.cleanup()
+
+    def test_complete_load_is_saved(self):
+        server.load_initial_data(DataLoader(api_client=self.client), self.snapshot_dir)
+        loader = DataLoader()
+        loader.load_snapshot(self.snapshot_dir)
+        self.assertEqual(loader.get_total_artists(), 30)
+
+    def test_incomplete_load_is_served_but_not_saved(self):
+        self.stub.failures[2] = [503] * 10
+        data_loader = DataLoader(api_client=self.client)
+        server.load_initial_data(data_loader, self.snapshot_dir)
+        self.assertEqual(data_loader.get_total_artists(), 20)
+        self.assertFalse(os.path.exists(self.snapshot_dir))
+
+if __name__ == '__main__':
+    unittest.main()
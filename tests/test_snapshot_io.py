@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import snapshot_io
+from api_client import APIClient
+from artist_store import ArtistStoreBuilder
+from data_loader import DataLoader
+from snapshot import Snapshot
+from snapshot_io import SnapshotError
+from wasabi_stub import WasabiStub, generate_pages
+
+class TestSnapshotIO(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with WasabiStub(generate_pages(2, artists_per_page=40, albums_per_artist=2, songs_per_album=3)) as stub:
+            client = APIClient(base_url=stub.base_url, backoff_factor=0)
+            cls.loader = DataLoader(api_client=client)
+            cls.loader.load_artists()
+            client.close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "snapshot")
+        self.loader.save_snapshot(self.directory)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def column_path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def test_round_trip_without_network(self):
+        loader = DataLoader(api_client=APIClient(base_url="http://127.0.0.1:9/"))  # Aucun serveur : tout appel échouerait
+        loader.load_snapshot(self.directory)
+        self.assertEqual(loader.version, self.loader.version)
+        self.assertEqual(loader.get_total_artists(), 80)
+        self.assertEqual(list(loader.get_artist_data()), list(self.loader.get_artist_data()))
+        self.assertEqual(loader.get_country_popularity(), self.loader.get_country_popularity())
+        self.assertEqual(loader.get_genre_popularity_by_country(), self.loader.get_genre_popularity_by_country())
+        self.assertEqual(loader.get_top_artists(5, country="France"), self.loader.get_top_artists(5, country="France"))
+        self.assertEqual(loader.search_artists(prefix="artist 1", order="name", limit=None),
+                         self.loader.search_artists(prefix="artist 1", order="name", limit=None))
+        self.assertIsInstance(loader.artist_store.fans, np.memmap)
+        self.assertIsInstance(loader.snapshot.index.pair_artists, np.memmap)
+
+    def test_loaded_snapshot_can_be_extended(self):
+        loader = DataLoader()
+        loader.load_snapshot(self.directory, verify=False)
+        builder = ArtistStoreBuilder(loader.artist_store)
+        builder.append("Nouveau", "Lyon", "France", 7, ["Pop"], {})
+        store = builder.build()
+        self.assertEqual(len(store), 81)
+        self.assertEqual(store.record(80)["location"], "Lyon, France")
+
+    def test_non_string_keys(self):
+        builder = ArtistStoreBuilder()
+        builder.append("Sans pays", None, None, 3, ["Rock"], {})
+        directory = os.path.join(self.tmp.name, "none")
+        snapshot_io.save_snapshot(Snapshot.from_store(builder.build(), 1), directory)
+        snapshot = snapshot_io.load_snapshot(directory)
+        self.assertEqual(snapshot.country_popularity, {None: {"artist_count": 1, "total_popularity": 3}})
+        self.assertEqual(snapshot.genre_popularity_by_country, {None: {"Rock": 3}})
+
+    def test_lone_surrogates(self):
+        builder = ArtistStoreBuilder()
+        builder.append("Moitié \ud83d", "Ville \udc00", "Pays \ud83d", 3, ["Genre \ud83d"], {})
+        directory = os.path.join(self.tmp.name, "surrogates")
+        snapshot_io.save_snapshot(Snapshot.from_store(builder.build(), 1), directory)
+        snapshot = snapshot_io.load_snapshot(directory)
+        self.assertEqual(snapshot.store.record(0)["name"], "Moitié \ud83d")
+        self.assertEqual(snapshot.genre_popularity_by_country, {"Pays \ud83d": {"Genre \ud83d": 3}})
+
+    def test_corrupted_column_detected(self):
+        with open(self.column_path("fans"), "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        with self.assertRaisesRegex(SnapshotError, "SHA-256"):
+            snapshot_io.load_snapshot(self.directory)
+        snapshot_io.load_snapshot(self.directory, verify=False)  # Seules la taille et la forme sont vérifiées
+
+    def test_truncated_or_missing_column_detected(self):
+        with open(self.column_path("names.data"), "r+b") as f:
+            f.truncate(10)
+        with self.assertRaisesRegex(SnapshotError, "Taille"):
+            snapshot_io.load_snapshot(self.directory, verify=False)
+        os.remove(self.column_path("genre_codes"))
+        with self.assertRaisesRegex(SnapshotError, "manquante"):
+            snapshot_io.load_snapshot(self.directory, verify=False)
+
+    def test_manifest_checks(self):
+        path = os.path.join(self.directory, snapshot_io.MANIFEST_FILE)
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        manifest["country_popularity"][0][1]["artist_count"] += 1
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.assertRaisesRegex(SnapshotError, "corrompu"):
+            snapshot_io.load_snapshot(self.directory)
+
+        manifest["schema_version"] = snapshot_io.SCHEMA_VERSION + 1
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.assertRaisesRegex(SnapshotError, "schéma"):
+            snapshot_io.load_snapshot(self.directory)
+
+        with self.assertRaises(SnapshotError):
+            snapshot_io.load_snapshot(os.path.join(self.tmp.name, "absent"))
+
+if __name__ == '__main__':
+    unittest.main()